@@ -0,0 +1,80 @@
+"""Compares the data writers on a simulation case.
+
+Runs a case once with each data writer, reports the wall time of each run
+and checks that both runs write the same files. The process writer can only
+be faster when a second core is free to format and write the data.
+
+Usage::
+
+    python benchmark_writer.py cases/case2.json -t Reno
+"""
+import argparse
+import filecmp
+import os
+import shutil
+import sys
+import tempfile
+import time
+from blackwidow import BlackWidow, parser
+
+
+def run(config, tcp_alg, data_writer, data_dir):
+    """Runs a case and returns its wall time in seconds.
+
+    Parameters
+    ----------
+    config : str
+        Path of the network configuration.
+    tcp_alg : str
+        The TCP algorithm to use.
+    data_writer : str
+        The data writer to use, 'file' or 'process'.
+    data_dir : str
+        Directory to write the data files to.
+    """
+    settings = {'log_file': os.path.splitext(os.path.basename(config))[0],
+                'data_dir': data_dir,
+                'tcp_alg': tcp_alg,
+                'data_writer': data_writer}
+    bw = BlackWidow(settings)
+    network = parser.config_network(config, bw)
+    start = time.time()
+    network.run()
+    return time.time() - start
+
+
+def main():
+    """Runs the benchmark."""
+    arg_parser = argparse.ArgumentParser(description='Compare the data '
+                                                     'writers on a case.')
+    arg_parser.add_argument('config', type=str,
+                            help='Network configuration to run.')
+    arg_parser.add_argument('-t', '--tcp-alg', type=str, default='Reno',
+                            help='Sets the TCP algorithm for the simulation.')
+    args = arg_parser.parse_args()
+
+    dirs = {}
+    times = {}
+    try:
+        for data_writer in ['file', 'process']:
+            dirs[data_writer] = tempfile.mkdtemp()
+            times[data_writer] = run(args.config, args.tcp_alg, data_writer,
+                                     dirs[data_writer])
+            print '{0:8} {1:8.2f} s'.format(data_writer, times[data_writer])
+        print 'speedup  {0:8.2f}x'.format(times['file'] / times['process'])
+
+        names = sorted(os.listdir(dirs['file']))
+        match, mismatch, errors = filecmp.cmpfiles(dirs['file'],
+                                                   dirs['process'], names,
+                                                   shallow=False)
+        if (mismatch or errors or
+                names != sorted(os.listdir(dirs['process']))):
+            print 'Data files differ: {0}'.format(mismatch + errors)
+            sys.exit(1)
+        print 'Data files match ({0} files).'.format(len(match))
+    finally:
+        for data_dir in dirs.itervalues():
+            shutil.rmtree(data_dir)
+
+if __name__ == '__main__':
+    main()
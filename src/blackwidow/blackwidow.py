@@ -1,5 +1,8 @@
 import parser
 from graph import CsvGrapher
+from log import DEBUG, WARNING, Log
+from metrics import Metrics
+from sampling import parse_policies
 import re
 import os
 
@@ -18,7 +21,11 @@ class BlackWidow(object):
             real_time : bool
                 Whether to graph in real time or write to files.
             show_verbose : bool
-                Whether to print statements labelled verbose.
+                Whether to print statements labelled verbose. Sets the
+                default log level to debug.
+            log_levels : str
+                Log levels to set on top of the default. See `Log.configure`
+                for the format.
             log_file : str
                 Name of file to write to. This is the prefix for all data types
                 written to files. See documentation for write for more
@@ -32,6 +39,51 @@ class BlackWidow(object):
             tcp_alg : str
                 Which TCP algorithm to use. Must be 'Reno', 'Fast', or
                 'Tahoe'.
+            event_queue : str
+                Which event queue implementation to use. Must be 'heap' or
+                'calendar'. All implementations run events in the same order.
+            disabled_data : list or str
+                Kinds or names of data channels not to record, e.g.
+                ['link.buffer', 'flow_F1.window']. A string is split on
+                commas.
+            sampling : dict or str
+                Sampling policies of data channels by kind or name, e.g.
+                {'link.buffer': 'every:10'}. A string is parsed with
+                `parse_policies`, e.g. 'link.buffer=every:10'.
+            summary : bool
+                Whether to keep summary statistics of each data channel
+                while the simulation runs and write them to
+                [log_file].summary.json. The completion time of each flow
+                in ms is the mean of its flow_[id].completion_time channel.
+            quantiles : list or str
+                Kinds or names of data channels to estimate p50, p95 and
+                p99 of, e.g. ['flow.packet_delay', 'link.buffer']. They
+                are written to [log_file].summary.json. A string is split
+                on commas.
+            raw_data : bool
+                Whether to store the points of data channels. If False,
+                only channels with their own sampling policy are stored,
+                which with summary set lets a run keep only its summaries.
+            data_writer : str
+                How data files are written while the simulation runs. Must
+                be 'file' to write them from the simulation process or
+                'process' to hand them to a separate writer process.
+            data_format : str
+                Format of data files. Must be 'csv' for a CSV file per data
+                channel or 'binary' for a single result file per run.
+            data_compression : str
+                Compression of binary result files. Must be None, 'zlib' or
+                'bz2'.
+
+    Attributes
+    ----------
+    log : `Log`
+        Log of simulation messages. Objects in the network get their
+        loggers from it.
+    show_verbose : bool
+        Whether the default log level is debug.
+    metrics : `Metrics`
+        Registry of the data channels recorded by objects in the network.
 
     Methods
     -------
@@ -40,8 +92,10 @@ class BlackWidow(object):
         the BlackWidow object is constructed.
     print_verbose(msg)
         Handles a verbose message based on specified settings.
-    record(data, data_type)
-        Records data based on specified settings.
+    open_data()
+        Starts writing recorded data to files as it is recorded.
+    write()
+        Writes recorded data to files.
 
 
     Examples
@@ -65,11 +119,19 @@ class BlackWidow(object):
         if 'real_time' in settings:
             self.real_time = settings['real_time']  # Override default
 
+        # Log of simulation messages
+        self.log = Log()
+
         # Show verbose output
         self.show_verbose = False
         if 'show_verbose' in settings:
             self.show_verbose = settings['show_verbose']
 
+        # Log levels
+        if ('log_levels' in settings and
+                settings['log_levels'] is not None):
+            self.log.configure(settings['log_levels'])
+
         # Static routing
         self.static_routing = False
         if 'static_routing' in settings:
@@ -103,9 +165,65 @@ class BlackWidow(object):
         if ('tcp_alg' in settings and settings['tcp_alg'] is not None):
             self.tcp_alg = settings['tcp_alg']
 
-        # Initialize the data to be empty. This dictionary will contain all
-        # recorded data.
-        self.data = {}
+        # Event queue implementation
+        self.event_queue = 'heap'
+        if ('event_queue' in settings and
+                settings['event_queue'] is not None):
+            self.event_queue = settings['event_queue']
+
+        # Data channels not to record
+        disabled = []
+        if ('disabled_data' in settings and
+                settings['disabled_data'] is not None):
+            disabled = settings['disabled_data']
+            if isinstance(disabled, basestring):
+                disabled = [key.strip() for key in disabled.split(',')]
+
+        # Writer of data files
+        self.data_writer = 'file'
+        if ('data_writer' in settings and
+                settings['data_writer'] is not None):
+            self.data_writer = settings['data_writer']
+
+        # Format of data files
+        self.data_format = 'csv'
+        if ('data_format' in settings and
+                settings['data_format'] is not None):
+            self.data_format = settings['data_format']
+
+        # Compression of binary result files
+        self.data_compression = None
+        if 'data_compression' in settings:
+            self.data_compression = settings['data_compression']
+
+        # Sampling policies of data channels
+        sampling = None
+        if ('sampling' in settings and settings['sampling'] is not None):
+            sampling = settings['sampling']
+            if isinstance(sampling, basestring):
+                sampling = parse_policies(sampling)
+
+        # Whether to store the points of data channels
+        if 'raw_data' in settings and settings['raw_data'] is False:
+            sampling = dict(sampling or {})
+            sampling['*'] = 'none'
+
+        # Summary statistics of data channels
+        summary = False
+        if 'summary' in settings and settings['summary'] is not None:
+            summary = settings['summary']
+
+        # Data channels to estimate quantiles of
+        quantiles = []
+        if 'quantiles' in settings and settings['quantiles'] is not None:
+            quantiles = settings['quantiles']
+            if isinstance(quantiles, basestring):
+                quantiles = [key.strip() for key in quantiles.split(',')]
+
+        # Registry of recorded data. Objects in the network create their data
+        # channels in it when they are constructed.
+        self.metrics = Metrics(self.log, disabled, sampling, summary,
+                               quantiles)
 
     def run(self, file_name):
         """Runs the overall simulation based on settings specified when the
@@ -164,6 +282,17 @@ class BlackWidow(object):
             self.grapher.graph(int(sim_time))
         return sim_time
 
+    @property
+    def show_verbose(self):
+        return self.log.level <= DEBUG
+
+    @show_verbose.setter
+    def show_verbose(self, value):
+        if value:
+            self.log.level = DEBUG
+        else:
+            self.log.level = WARNING
+
     def print_verbose(self, msg):
         """Handles a verbose message based on specified settings.
 
@@ -173,59 +302,52 @@ class BlackWidow(object):
             Message to show.
         """
         if self.show_verbose:
-            print msg
-
-    def record(self, data, data_type):
-        """Records data based on specified settings.
+            self.log.write(msg)
 
-        Parameters
-        ----------
-        data : str
-            Data point to record/plot.
-        data_type : str
-            Type of data, will be used as a file extension.
+    def open_data(self):
+        """ Starts writing data to files as it is recorded.
 
-        Notes
-        -----
-        Standard data types:
-            link.drop    -  "Time in ms", "Number of drops"
-            link.sent    -  "Time in ms", "Number of packets sent"
-            flow.window  -  "Time in ms", "Window size"
-            flow.sent    -  "Time in ms", "Mega bits"
-            flow.delay   -  "Time in ms", "Delay in ms"
+        Data is written in chunks to the same files as `write`, so that
+        memory use does not grow with the length of the simulation. Does
+        nothing if the log file is not defined.
         """
-        if self.real_time:
-            data_num = [float(x) for x in data.split(", ")]
-            pass
-
-        # Add to existing data type
-        if data_type in self.data:
-            self.data[data_type].append(data)
-
-        # Create new data type and add the data
-        else:
-            self.data[data_type] = [data]
-        if self.show_verbose:
-            print data
+        if self.log_file is not None:
+            self.metrics.open('{}/{}'.format(self.data_dir, self.log_file),
+                              self.data_writer, self.data_format,
+                              self.data_compression)
 
     def write(self):
         """ Writes data to files.
 
-        This function writes each type of data to a file. The files are
-        dependent on the extensions used to save data and the log_file file.
+        This function writes each data channel to a file. The files are
+        dependent on the channel names and the log_file file.
         Files are created as:
-            [log_file].[data_type].csv
-        Files are created in the data_dir directory in CSV format.
+            [log_file].[name].csv
+        Files are created in the data_dir directory in CSV format. Channels
+        without any points are not written. Data still buffered after
+        `open_data` is written and the files are closed. With the 'binary'
+        data format, all channels are written to the single file
+        [log_file].bwr instead, which can be read with `ResultFile` and
+        converted with `to_csv`.
 
+        Notes
+        -----
+        Standard channel kinds:
+            link.buffer        -  "Time in ms", "Buffer size in bits"
+            link.drop          -  "Time in ms"
+            link.sent          -  "Time in ms", "Bits sent"
+            link.rate          -  "Time in ms", "Rate in Mbps"
+            flow.sent          -  "Time in ms", "Bits sent"
+            flow.received      -  "Time in ms", "Bits received"
+            flow.window        -  "Time in ms", "Window size"
+            flow.packet_delay  -  "Time in ms", "Delay in ms"
+            flow.completion_time
+                               -  "Time in ms", "Completion time in ms"
+            [object].send_rate, [object].receive_rate
+                               -  "Time in ms", "Rate in bits per ms"
         """
 
         # Check if the log file is defined. If not, we cannot write data.
         if self.log_file is not None:
-            # Write each data type to a file
-            for data_type in self.data:
-                # Open file
-                with open('{}/{}.{}.csv'.format(self.data_dir, self.log_file,
-                                                data_type), 'a') as f:
-                    # Write data
-                    for data in self.data[data_type]:
-                        f.write(data + '\n')
+            self.open_data()
+            self.metrics.close()
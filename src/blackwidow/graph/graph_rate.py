@@ -2,6 +2,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+from blackwidow.results import ResultFile, result_path
 
 
 class GraphSettings(object):
@@ -13,7 +14,7 @@ class GraphSettings(object):
 
 
 class CsvGrapher(object):
-    """Graphs the .csv files.
+    """Graphs the .csv files, or the binary result file of the run.
 
     Parameters
     ----------
@@ -25,18 +26,24 @@ class CsvGrapher(object):
     bw : `BlackWidow`
         BlackWidow simulation object containing simulation settings.
     data_dir : string
-        Data directory containing .csv files.
+        Data directory containing .csv files or the result file.
     log_file : string
         Base file name for the log file indicating case number.
     smooth_factor : int
         Number of data points to average for rates.
     max_capacity : float
         Maximum capacity for link rates to throw out outliers.
+    t_start : float
+        Earliest time to graph in ms, or None to start at the beginning.
+    t_end : float
+        Latest time to graph in ms, or None to graph until the end.
 
     Methods
     -------
     graph(sim_time)
         Graph all desired rates based on the csv files.
+    load(name)
+        Load the points of a data channel between t_start and t_end.
 
     """
 
@@ -47,6 +54,8 @@ class CsvGrapher(object):
         self.log_file = bw.log_file
         self.smooth_factor = 100
         self.max_capacity = 12.5
+        self.t_start = None
+        self.t_end = None
         sns.set()
         self.case_num = self.bw.log_file
         cc_type = 'Fixed Window'
@@ -70,6 +79,50 @@ class CsvGrapher(object):
                 self.devices.append([link, 'flow', 2])
         self.fig = plt.figure(1, figsize=(15, 8))
         self.fig.suptitle(self.case_num, fontsize=32, fontweight='bold')
+        self._results = None
+
+    def load(self, name):
+        """Load the points of a data channel between t_start and t_end.
+
+        Points are read from the binary result file of the run if there is
+        one, which only reads the part of the file in the time range. Runs
+        without one are read from the .csv file of the channel.
+
+        Parameters
+        ----------
+        name : string
+            The name of the channel, e.g. 'link_L1.buffer'.
+
+        Returns
+        -------
+        ndarray
+            A row of time and value per point, or the times for channels
+            without values. None if the channel was not recorded.
+        """
+        if self._results is None:
+            path = result_path(self.data_dir, self.log_file)
+            if os.path.isfile(path):
+                self._results = ResultFile(path)
+        if self._results is not None:
+            if name not in self._results.names:
+                return None
+            times, values = self._results.read(name, self.t_start,
+                                                self.t_end)
+            if values is None:
+                return times
+            return np.column_stack((times, values))
+
+        file_name = '{}/{}.{}.csv'.format(self.data_dir, self.log_file, name)
+        if not os.path.isfile(file_name):
+            return None
+        data = np.genfromtxt(file_name, delimiter=',')
+        times = data[:, 0] if data.ndim == 2 else data
+        in_range = np.ones(len(times), dtype=bool)
+        if self.t_start is not None:
+            in_range &= times >= self.t_start
+        if self.t_end is not None:
+            in_range &= times <= self.t_end
+        return data[in_range]
 
     def graph(self, sim_time):
         plt.ioff()
@@ -77,7 +130,6 @@ class CsvGrapher(object):
         smooth_factor = self.smooth_factor
         max_capacity = self.max_capacity
         case_num = self.case_num
-        data_dir = self.data_dir
         log_file = self.log_file
 
         links = [y for y in devices if y[0][0] == 'L']
@@ -87,23 +139,20 @@ class CsvGrapher(object):
 
         data_types = ['sent']
 
-        flow_path = '{}/{}.{}_{}.{}.csv'
-
         fig = plt.figure(1, figsize=(15, 8))
 
         # Rate calculations.
         for i, device in enumerate(devices):
             for j, data_type in enumerate(data_types):
-                file_name = flow_path.format(data_dir, log_file, device[1],
-                                             device[0], data_type)
+                data = self.load('{}_{}.{}'.format(device[1], device[0],
+                                                   data_type))
 
-                if (os.path.isfile(file_name)):
+                if data is not None:
                     print 'Computing {} {} {} rate'.format(log_file, device[0],
                                                            data_type)
                 else:
                     continue
 
-                data = np.genfromtxt(file_name, delimiter=',')
                 rate = []
                 time = []
                 for k in range(data.size / 2 - smooth_factor):
@@ -135,14 +184,10 @@ class CsvGrapher(object):
         fig = plt.figure(1, figsize=(15, 8))
 
         for link in links:
-            buffer_occupancy_path = '{}/{}.link_{}.buffer.csv'.format(data_dir,
-                                                                      log_file,
-                                                                      link[0])
-
-            if (os.path.isfile(buffer_occupancy_path)):
-                # Load in buffer occupancy data
-                buffer_occupancy = np.genfromtxt(buffer_occupancy_path,
-                                                 delimiter=',')
+            # Load in buffer occupancy data
+            buffer_occupancy = self.load('link_{}.buffer'.format(link[0]))
+
+            if buffer_occupancy is not None:
                 buffer_occupancy = buffer_occupancy.astype(int)
                 buffer_occupancy_times = buffer_occupancy[:, 0]
                 buffer_occupancy = buffer_occupancy[:, 1]
@@ -157,12 +202,9 @@ class CsvGrapher(object):
                 plt.draw()
 
         for link in self.drop_list:
-            packet_loss_path = '{}/{}.link_{}.drop.csv'.format(data_dir,
-                                                               log_file,
-                                                               link)
-            if (os.path.isfile(packet_loss_path)):
-                # Load in packet loss data
-                packet_loss_times = np.genfromtxt(packet_loss_path)
+            # Load in packet loss data
+            packet_loss_times = self.load('link_{}.drop'.format(link))
+            if packet_loss_times is not None:
                 packet_loss_times = packet_loss_times.astype(int)
                 packet_loss = np.zeros(sim_time)
 
@@ -184,15 +226,11 @@ class CsvGrapher(object):
         fig = plt.figure(1, figsize=(15, 8))
 
         for flow in flows:
-            window_size_path = '{}/{}.flow_{}.window.csv'.format(data_dir,
-                                                                 log_file,
-                                                                 flow[0])
-            packet_delay_path = ("{}/{}.flow_{}.packet_delay."
-                                 "csv".format(data_dir, log_file, flow[0]))
-
-            if (os.path.isfile(window_size_path)):
-                # Load in window size data
-                window_size = np.genfromtxt(window_size_path, delimiter=',')
+            # Load in window size and packet delay data
+            window_size = self.load('flow_{}.window'.format(flow[0]))
+            packet_delay = self.load('flow_{}.packet_delay'.format(flow[0]))
+
+            if window_size is not None:
                 window_size = window_size.astype(int)
                 window_size_times = window_size[:, 0]
                 window_size = window_size[:, 1]
@@ -205,9 +243,7 @@ class CsvGrapher(object):
                 plt.xlabel('time (ms)', fontsize=18)
                 plt.ylabel('window size (pkts)', fontsize=18)
 
-            if (os.path.isfile(packet_delay_path)):
-                # Load in packet delay
-                packet_delay = np.genfromtxt(packet_delay_path, delimiter=',')
+            if packet_delay is not None:
                 packet_delay = packet_delay.astype(int)
                 packet_delay_times = packet_delay[:, 0]
                 packet_delay = packet_delay[:, 1]
@@ -226,13 +262,10 @@ class CsvGrapher(object):
         fig = plt.figure(1, figsize=(15, 8))
 
         for flow in flows:
-            flow_send_rate_path = ("{}/{}.flow {} send rate."
-                                   "csv".format(data_dir, log_file, flow[0]))
+            # Load in send rate data
+            flow_send_rate = self.load('flow {} send rate'.format(flow[0]))
 
-            if (os.path.isfile(flow_send_rate_path)):
-                # Load in send rate data
-                flow_send_rate = np.genfromtxt(flow_send_rate_path,
-                                               delimiter=',')
+            if flow_send_rate is not None:
                 flow_send_rate = flow_send_rate.astype(int)
                 flow_send_rate_times = flow_send_rate[:, 0]
                 flow_send_rate = flow_send_rate[:, 1]
@@ -245,12 +278,9 @@ class CsvGrapher(object):
                 plt.xlabel('time (ms)', fontsize=18)
                 plt.ylabel('flow rate (kilobits/s)', fontsize=18)
         for link in links:
-            link_send_rate_path = ("{}/{}.link {} send rate."
-                                   "csv".format(data_dir, log_file, link[0]))
-            if (os.path.isfile(link_send_rate_path)):
-                # Load in link send rate data
-                link_send_rate = np.genfromtxt(link_send_rate_path,
-                                               delimiter=',')
+            # Load in link send rate data
+            link_send_rate = self.load('link {} send rate'.format(link[0]))
+            if link_send_rate is not None:
                 link_send_rate = link_send_rate.astype(int)
                 link_send_rate_times = link_send_rate[:, 0]
                 link_send_rate = link_send_rate[:, 1]
@@ -266,6 +296,10 @@ class CsvGrapher(object):
         fig.suptitle(log_file, fontsize=32, fontweight='bold')
         plt.show()
 
+        if self._results is not None:
+            self._results.close()
+            self._results = None
+
         plt.ion()
 
 
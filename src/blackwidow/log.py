@@ -0,0 +1,252 @@
+import sys
+
+# Log levels. Messages are logged if their level is at least the level set
+# for the component and entity logging them.
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+
+LEVELS = {'debug': DEBUG, 'info': INFO, 'warning': WARNING, 'off': OFF}
+
+# Components that log messages. Messages from `Network.run` describing each
+# event are logged by the 'event' component with the id of the object that
+# created the event.
+COMPONENTS = ['event', 'flow', 'link', 'router', 'data']
+
+# Number of messages to buffer before writing them out.
+BUFFER_SIZE = 1000
+
+
+class Logger(object):
+    """Logs messages for one component and entity.
+
+    Loggers are created by `Log.get_logger`. Whether a level is enabled is
+    stored as a plain attribute, so that a disabled message costs a single
+    branch and the message is only formatted if it is logged::
+
+        if self._log.debug:
+            self._log.write("Flow sent packet {0}".format(pack.pack_id))
+
+    Parameters
+    ----------
+    log : `Log`
+        The log to write messages to.
+    component : string
+        The component logging messages, e.g. 'flow'.
+    entity : string
+        The id of the object logging messages, or None.
+
+    Attributes
+    ----------
+    component : string
+        The component logging messages.
+    entity : string
+        The id of the object logging messages, or None.
+    debug : bool
+        Whether debug messages are logged.
+    info : bool
+        Whether info messages are logged.
+    warning : bool
+        Whether warning messages are logged.
+
+    Methods
+    -------
+    update()
+        Reads the level of the logger from the log.
+    write(msg)
+        Writes a message to the log.
+    """
+
+    __slots__ = ['_log', 'component', 'entity', 'debug', 'info', 'warning']
+
+    def __init__(self, log, component, entity):
+        self._log = log
+        self.component = component
+        self.entity = entity
+        self.update()
+
+    def update(self):
+        """Reads the level of the logger from the log."""
+        level = self._log.level_of(self.component, self.entity)
+        self.debug = level <= DEBUG
+        self.info = level <= INFO
+        self.warning = level <= WARNING
+
+    def write(self, msg):
+        """Writes a message to the log.
+
+        Parameters
+        ----------
+        msg : string
+            The message to write.
+        """
+        self._log.write(msg)
+
+
+class Log(object):
+    """Leveled log of simulation messages.
+
+    Levels can be set for the whole simulation, for a component, for an
+    entity (e.g. flow F2 and the events it creates) or for a component of an
+    entity. The most specific level applies. Messages are buffered and
+    written to the stream in batches.
+
+    Parameters
+    ----------
+    level : int, optional
+        The default log level (the default is `WARNING`).
+    stream : file, optional
+        Stream to write messages to (the default is None, which writes to
+        the current `sys.stdout`).
+    buffer_size : int, optional
+        Number of messages to buffer before writing them (the default is
+        `BUFFER_SIZE`).
+
+    Attributes
+    ----------
+    level : int
+        The default log level.
+
+    Methods
+    -------
+    set_level(level, component=None, entity=None)
+        Sets the log level of a component, entity or both.
+    configure(spec)
+        Sets log levels from a string.
+    level_of(component, entity=None)
+        Returns the log level of a component and entity.
+    get_logger(component, entity=None)
+        Returns a logger for a component and entity.
+    write(msg)
+        Buffers a message.
+    flush()
+        Writes out all buffered messages.
+    """
+
+    def __init__(self, level=WARNING, stream=None, buffer_size=BUFFER_SIZE):
+        self._levels = {(None, None): level}
+        self._loggers = {}
+        self._stream = stream
+        self._buffer = []
+        self._buffer_size = buffer_size
+
+    @property
+    def level(self):
+        return self._levels[(None, None)]
+
+    @level.setter
+    def level(self, value):
+        self.set_level(value)
+
+    def set_level(self, level, component=None, entity=None):
+        """Sets the log level of a component, entity or both.
+
+        Parameters
+        ----------
+        level : int
+            The log level, e.g. `DEBUG`.
+        component : string, optional
+            The component to set the level of (the default is None, which
+            sets the level of all components).
+        entity : string, optional
+            The id of the entity to set the level of (the default is None,
+            which sets the level of all entities).
+        """
+        if component is not None and component not in COMPONENTS:
+            raise ValueError("Unknown log component {0}.".format(component))
+        self._levels[(component, entity)] = level
+        for logger in self._loggers.itervalues():
+            logger.update()
+
+    def configure(self, spec):
+        """Sets log levels from a string.
+
+        Parameters
+        ----------
+        spec : string
+            Comma separated list of ``level`` or ``key=level`` items, where
+            key is a component, an entity id or ``component:entity``. For
+            example, ``warning,flow:F2=debug`` logs debug messages of flow
+            F2 only.
+        """
+        for item in spec.split(','):
+            item = item.strip()
+            if not item:
+                continue
+            key, sep, name = item.rpartition('=')
+            if name.lower() not in LEVELS:
+                raise ValueError("Unknown log level {0}.".format(name))
+            level = LEVELS[name.lower()]
+            if not sep:
+                self.set_level(level)
+            elif ':' in key:
+                component, entity = key.split(':', 1)
+                self.set_level(level, component, entity)
+            elif key in COMPONENTS:
+                self.set_level(level, key)
+            else:
+                self.set_level(level, entity=key)
+
+    def level_of(self, component, entity=None):
+        """Returns the log level of a component and entity.
+
+        Parameters
+        ----------
+        component : string
+            The component.
+        entity : string, optional
+            The id of the entity (the default is None).
+
+        Returns
+        -------
+        int
+            The most specific level set for the component and entity.
+        """
+        levels = self._levels
+        for key in [(component, entity), (None, entity), (component, None)]:
+            if key in levels:
+                return levels[key]
+        return levels[(None, None)]
+
+    def get_logger(self, component, entity=None):
+        """Returns a logger for a component and entity.
+
+        Parameters
+        ----------
+        component : string
+            The component logging messages.
+        entity : string, optional
+            The id of the object logging messages (the default is None).
+
+        Returns
+        -------
+        `Logger`
+            Logger whose levels follow later calls to `set_level`.
+        """
+        key = (component, entity)
+        if key not in self._loggers:
+            if component not in COMPONENTS:
+                raise ValueError("Unknown log component "
+                                 "{0}.".format(component))
+            self._loggers[key] = Logger(self, component, entity)
+        return self._loggers[key]
+
+    def write(self, msg):
+        """Buffers a message, writing out the buffer once it is full.
+
+        Parameters
+        ----------
+        msg : string
+            The message to write.
+        """
+        self._buffer.append(msg)
+        if len(self._buffer) >= self._buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Writes out all buffered messages."""
+        if self._buffer:
+            stream = self._stream if self._stream is not None else sys.stdout
+            stream.write('\n'.join(self._buffer) + '\n')
+            self._buffer = []
@@ -0,0 +1,810 @@
+from array import array
+import bz2
+from collections import namedtuple
+from itertools import izip
+import multiprocessing
+import struct
+import zlib
+import numpy as np
+from sampling import needs_values, parse_policy
+from sketch import QuantileSketch
+from summary import Summary, write_summary
+
+# Number of points a channel buffers before writing them to its file.
+CHUNK_SIZE = 4096
+
+
+class Channel(object):
+    """Series of ``(time, value)`` points recorded by one object.
+
+    Channels are created by `Metrics.channel` when an object is constructed
+    and kept by the object. Whether the channel is recorded is a plain
+    attribute, so that a disabled channel costs a single check::
+
+        if self._buffer_data.enabled:
+            self._buffer_data.record(self.env.time, self._size)
+
+    Points are stored in two ``array('d')`` columns, which take 8 bytes per
+    number instead of a Python object each. A column keeps the type of its
+    first number, int or float, and the indices of the numbers of the other
+    type, so that every point is written exactly as it was recorded.
+
+    A channel can have a `Sampler` set from a sampling policy, which
+    decides which recorded points are stored. Points it drops are never
+    stored. A channel can also keep a `Summary` of all recorded points,
+    including those the sampler drops.
+
+    Once the registry is opened with `Metrics.open`, points are written to
+    the channel's file every `CHUNK_SIZE` points, so a channel holds at most
+    one chunk in memory.
+
+    Parameters
+    ----------
+    kind : string
+        The type of data, e.g. 'link.buffer'.
+    name : string
+        The name of the channel. Points are written to
+        ``[log_file].[name].csv``.
+    log : `Logger`
+        Logger to echo points to at the debug level.
+    entity : string, optional
+        The id of the object recording the points, e.g. 'L1' (the default
+        is None).
+    values : bool, optional
+        Whether the points have values (the default is True). Channels
+        recording times only, e.g. packet drops, cannot use sampling
+        policies that need values.
+
+    Attributes
+    ----------
+    kind : string
+        The type of data.
+    name : string
+        The name of the channel.
+    entity : string
+        The id of the object recording the points, or None.
+    values : bool
+        Whether the points have values.
+    summary : `Summary`
+        Summary statistics of the recorded points, or None.
+    enabled : bool
+        Whether points are recorded.
+
+    Methods
+    -------
+    record(time, value=None)
+        Records a point.
+    finish()
+        Stores any points still held by the sampler.
+    rows()
+        Returns the buffered points as lines of CSV.
+    flush()
+        Writes the buffered points to the channel's file.
+    """
+
+    __slots__ = ['kind', 'name', 'entity', 'values', 'summary', 'enabled',
+                 '_log', '_out', '_sampler', '_times', '_int_times',
+                 '_values', '_value_type', '_other_values']
+
+    def __init__(self, kind, name, log, entity=None, values=True):
+        self.kind = kind
+        self.name = name
+        self.entity = entity
+        self.values = values
+        self.summary = None
+        self.enabled = True
+        self._log = log
+        # Writer of the points, or None to keep them in memory.
+        self._out = None
+        # Sampler deciding which points are stored, or None to store all.
+        self._sampler = None
+        self._value_type = None
+        self._clear()
+
+    def _clear(self):
+        """Removes all buffered points."""
+        # Times are floats except for events scheduled at whole ms from the
+        # start of the run, so only the indices of int times are stored.
+        self._times = array('d')
+        self._int_times = array('L')
+        self._values = array('d')
+        self._other_values = array('L')
+
+    def __len__(self):
+        return len(self._times)
+
+    def record(self, time, value=None):
+        """Records a point.
+
+        Parameters
+        ----------
+        time : float
+            The time of the point in ms.
+        value : float, optional
+            The value of the point (the default is None, which records the
+            time only). Either all or none of the points of a channel have a
+            value.
+        """
+        if self.summary is not None:
+            self.summary.add(time, value)
+        if self._sampler is not None:
+            self._sampler.record(time, value)
+        else:
+            self._store(time, value)
+
+    def _store(self, time, value):
+        """Stores a point."""
+        times = self._times
+        if type(time) is not float:
+            self._int_times.append(len(times))
+        times.append(time)
+        if value is not None:
+            if type(value) is not self._value_type:
+                if self._value_type is None:
+                    self._value_type = type(value)
+                else:
+                    self._other_values.append(len(self._values))
+            self._values.append(value)
+        if self._log.debug:
+            self._log.write(_format(time, value))
+        if len(times) >= CHUNK_SIZE and self._out is not None:
+            self.flush()
+
+    def finish(self):
+        """Stores any points still held by the sampler."""
+        if self._sampler is not None:
+            self._sampler.finish()
+
+    def flush(self):
+        """Writes the buffered points to the channel's file.
+
+        Does nothing until the registry is opened.
+        """
+        if self._out is not None and len(self._times) > 0:
+            self._out.write(self.name, self._chunk(), self.kind,
+                            self.entity)
+            self._clear()
+
+    def rows(self):
+        """Returns the buffered points as lines of CSV.
+
+        Returns
+        -------
+        generator
+            ``"time, value"`` strings, or ``"time"`` for points without a
+            value.
+        """
+        return _rows(self._chunk())
+
+    def _chunk(self):
+        """Returns the buffered points as a `Chunk`."""
+        return Chunk(self._times, self._int_times, self._values,
+                     self._value_type, self._other_values)
+
+
+# Columns of points of a channel. times and values are arrays of numbers.
+# int_times holds the indices of the int times and other_values the indices
+# of the values whose type is not value_type.
+Chunk = namedtuple('Chunk', ['times', 'int_times', 'values', 'value_type',
+                             'other_values'])
+
+
+def _rows(chunk):
+    """Yields the points of a `Chunk` as lines of CSV."""
+    times = _restore(chunk.times, float, chunk.int_times)
+    if len(chunk.values) == 0:
+        return (_format(time, None) for time in times)
+    values = _restore(chunk.values, chunk.value_type, chunk.other_values)
+    return (_format(time, value) for time, value in izip(times, values))
+
+
+def _restore(column, number_type, others):
+    """Yields the numbers of a column as Python objects of the types they
+    were recorded with.
+
+    Parameters
+    ----------
+    column : array
+        The numbers.
+    number_type : type
+        The type of most numbers, int or float.
+    others : array
+        Indices of the numbers of the other type.
+    """
+    others = set(others)
+    other_type = float if number_type is int else int
+    for i, number in enumerate(column):
+        if i in others:
+            yield other_type(number)
+        else:
+            yield number_type(number)
+
+
+def _format(time, value):
+    """Formats a point as a line of CSV."""
+    if value is None:
+        return '{0}'.format(time)
+    return '{0}, {1}'.format(time, value)
+
+
+class CsvWriter(object):
+    """Writes chunks of points to one CSV file per channel.
+
+    Files are opened in append mode the first time a channel writes to them
+    and kept open until `close`.
+
+    Parameters
+    ----------
+    prefix : string
+        Path prefix of the files. Points of a channel are written to
+        ``[prefix].[name].csv``.
+    compression : string, optional
+        Must be None. CSV files are not compressed.
+
+    Methods
+    -------
+    write(name, chunk, kind=None, entity=None)
+        Writes a chunk of points of a channel.
+    flush()
+        Flushes the files.
+    close()
+        Closes the files.
+    """
+
+    def __init__(self, prefix, compression=None):
+        if compression is not None:
+            raise ValueError("CSV files cannot be compressed.")
+        self._prefix = prefix
+        self._files = {}
+
+    def write(self, name, chunk, kind=None, entity=None):
+        """Writes a chunk of points of a channel.
+
+        Parameters
+        ----------
+        name : string
+            The name of the channel.
+        chunk : `Chunk`
+            The points.
+        kind : string, optional
+            The type of data. Not written to CSV files.
+        entity : string, optional
+            The id of the object recording the points. Not written to CSV
+            files.
+        """
+        f = self._files.get(name)
+        if f is None:
+            f = open('{}.{}.csv'.format(self._prefix, name), 'a')
+            self._files[name] = f
+        for row in _rows(chunk):
+            f.write(row + '\n')
+
+    def flush(self):
+        """Flushes the files."""
+        for f in self._files.itervalues():
+            f.flush()
+
+    def close(self):
+        """Closes the files."""
+        for f in self._files.itervalues():
+            f.close()
+        self._files = {}
+
+
+# Binary result files have the extension RESULT_EXTENSION. A file starts
+# with a HEADER of the magic string, the compression code and the offset and
+# size of the index at the end of the file. The index lists the channels in
+# the order they were first written. Each channel is stored as its name, its
+# kind and its entity (empty if None), each preceded by its length, followed
+# by its number of blocks and a BLOCK entry per block.
+RESULT_EXTENSION = 'bwr'
+MAGIC = 'BWR2'
+HEADER = struct.Struct('<4sB3xQQ')
+NAME_SIZE = struct.Struct('<H')
+BLOCK_COUNT = struct.Struct('<I')
+
+# Index entry of a block of points. A block stores the sections listed in
+# SECTIONS one after the other, each compressed on its own. sizes holds the
+# stored size of each section in bytes.
+BLOCK = np.dtype([('offset', '<u8'), ('count', '<u4'), ('t_first', '<f8'),
+                  ('t_last', '<f8'), ('value_type', 'u1'),
+                  ('sizes', '<u4', (4,))])
+
+# Sections of a block and their types. Times are stored as differences
+# between the bit patterns of consecutive times, which restores them exactly
+# and leaves runs of equal small numbers for the compressor.
+SECTIONS = [('times', '<i8'), ('int_times', '<u4'), ('values', '<f8'),
+            ('other_values', '<u4')]
+
+# Codes of compressions and value types in result files.
+COMPRESSIONS = [None, 'zlib', 'bz2']
+VALUE_TYPES = [None, int, float]
+
+# Compression functions of the compressions in COMPRESSIONS.
+COMPRESSORS = {'zlib': (zlib.compress, zlib.decompress),
+               'bz2': (bz2.compress, bz2.decompress)}
+
+
+class BinaryWriter(object):
+    """Writes chunks of points of all channels to one binary result file.
+
+    Each chunk is stored as a block of packed columns: the time column as
+    differences between consecutive times and the value column as 8 byte
+    floats, along with the indices needed to restore the type of every
+    number. The index of the blocks of each channel is written at the end of
+    the file by `close`. Points must be recorded in time order, so that the
+    first and last times of the blocks can be searched.
+
+    Parameters
+    ----------
+    prefix : string
+        Path prefix of the file. Points are written to
+        ``[prefix].bwr``.
+    compression : string, optional
+        Stdlib compression of the blocks, 'zlib' or 'bz2' (the default is
+        None, which stores them uncompressed).
+
+    Methods
+    -------
+    write(name, chunk, kind=None, entity=None)
+        Writes a chunk of points of a channel as a block.
+    flush()
+        Flushes the file.
+    close()
+        Writes the index and closes the file.
+    """
+
+    def __init__(self, prefix, compression=None):
+        if compression not in COMPRESSIONS:
+            raise ValueError("Unknown compression {0}.".format(compression))
+        self._compression = COMPRESSIONS.index(compression)
+        self._compress = None
+        if compression is not None:
+            self._compress = COMPRESSORS[compression][0]
+        self._file = open('{}.{}'.format(prefix, RESULT_EXTENSION), 'wb')
+        self._file.write(HEADER.pack(MAGIC, self._compression, 0, 0))
+        self._names = []
+        self._blocks = {}
+
+    def write(self, name, chunk, kind=None, entity=None):
+        """Writes a chunk of points of a channel as a block.
+
+        Parameters
+        ----------
+        name : string
+            The name of the channel.
+        chunk : `Chunk`
+            The points.
+        kind : string, optional
+            The type of data (the default is None).
+        entity : string, optional
+            The id of the object recording the points (the default is None).
+        """
+        times = _numbers(chunk.times)
+        bits = times.view(np.int64)
+        deltas = bits.copy()
+        deltas[1:] -= bits[:-1]
+        columns = [deltas, _numbers(chunk.int_times), _numbers(chunk.values),
+                   _numbers(chunk.other_values)]
+        offset = self._file.tell()
+        sizes = []
+        for column, (_, dtype) in izip(columns, SECTIONS):
+            data = column.astype(dtype).tostring()
+            if self._compress is not None:
+                data = self._compress(data)
+            self._file.write(data)
+            sizes.append(len(data))
+
+        if name not in self._blocks:
+            self._names.append((name, kind, entity))
+            self._blocks[name] = []
+        self._blocks[name].append((offset, len(times), times[0], times[-1],
+                                   VALUE_TYPES.index(chunk.value_type),
+                                   sizes))
+
+    def flush(self):
+        """Flushes the file."""
+        self._file.flush()
+
+    def close(self):
+        """Writes the index and closes the file."""
+        index_offset = self._file.tell()
+        for name, kind, entity in self._names:
+            blocks = self._blocks[name]
+            for text in [name, kind or '', entity or '']:
+                self._file.write(NAME_SIZE.pack(len(text)))
+                self._file.write(text)
+            self._file.write(BLOCK_COUNT.pack(len(blocks)))
+            self._file.write(np.array(blocks, dtype=BLOCK).tostring())
+        index_size = self._file.tell() - index_offset
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, self._compression,
+                                     index_offset, index_size))
+        self._file.close()
+
+
+class ProcessWriter(object):
+    """Writes chunks of points from a separate process.
+
+    Chunks are sent as raw bytes over a pipe to a child process, which
+    writes them with the writer of the data format. The simulation only copies
+    each chunk into the pipe, so formatting and file I/O can run on another
+    core. A full pipe blocks the simulation until the child process catches
+    up. `flush` waits until the child process has written everything sent
+    before it.
+
+    Parameters
+    ----------
+    prefix : string
+        Path prefix of the files.
+    data_format : string, optional
+        The data format, 'csv' or 'binary' (the default is 'csv').
+    compression : string, optional
+        Compression of binary result files (the default is None).
+
+    Methods
+    -------
+    write(name, chunk, kind=None, entity=None)
+        Sends a chunk of points of a channel to the writer process.
+    flush()
+        Waits for the writer process to write and flush everything sent.
+    close()
+        Waits for the writer process to write everything and exit.
+    """
+
+    def __init__(self, prefix, data_format='csv', compression=None):
+        receiver, self._sender = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_write_chunks,
+            args=(receiver, FORMATS[data_format], prefix, compression))
+        self._process.daemon = True
+        self._process.start()
+        receiver.close()
+
+    def write(self, name, chunk, kind=None, entity=None):
+        """Sends a chunk of points of a channel to the writer process.
+
+        Parameters
+        ----------
+        name : string
+            The name of the channel.
+        chunk : `Chunk`
+            The points.
+        kind : string, optional
+            The type of data (the default is None).
+        entity : string, optional
+            The id of the object recording the points (the default is None).
+        """
+        self._sender.send((name, chunk.times.tostring(),
+                           chunk.int_times.tostring(),
+                           chunk.values.tostring(), chunk.value_type,
+                           chunk.other_values.tostring(), kind, entity))
+
+    def flush(self):
+        """Waits for the writer process to write and flush everything sent.
+
+        Raises
+        ------
+        RuntimeError
+            If the writer process exited.
+        """
+        self._sender.send(FLUSH)
+        try:
+            self._sender.recv()
+        except EOFError:
+            raise RuntimeError("Writer process exited before flushing.")
+
+    def close(self):
+        """Waits for the writer process to write everything and exit."""
+        self._sender.send(None)
+        self._sender.close()
+        self._process.join()
+        if self._process.exitcode != 0:
+            raise RuntimeError("Writer process failed with exit code "
+                               "{0}.".format(self._process.exitcode))
+
+
+# Message asking the writer process to flush its files. The writer process
+# sends it back once it has.
+FLUSH = 'flush'
+
+
+def _write_chunks(receiver, writer_class, prefix, compression):
+    """Writes the chunks received from a `ProcessWriter` until it closes.
+
+    Parameters
+    ----------
+    receiver : `Connection`
+        The end of the pipe of the writer process.
+    writer_class : class
+        The writer of the data format, e.g. `CsvWriter`.
+    prefix : string
+        Path prefix of the files.
+    compression : string
+        Compression of the files.
+    """
+    writer = writer_class(prefix, compression)
+    while True:
+        message = receiver.recv()
+        if message is None:
+            break
+        if message == FLUSH:
+            writer.flush()
+            receiver.send(FLUSH)
+            continue
+        (name, times, int_times, values, value_type, other_values, kind,
+         entity) = message
+        writer.write(name, Chunk(_array('d', times), _array('L', int_times),
+                                 _array('d', values), value_type,
+                                 _array('L', other_values)), kind, entity)
+    writer.close()
+
+
+def _array(typecode, data):
+    """Returns an array of typecode with the numbers packed in data."""
+    numbers = array(typecode)
+    numbers.fromstring(data)
+    return numbers
+
+
+def _numbers(column):
+    """Returns a numpy view of the numbers in an array."""
+    return np.frombuffer(column, dtype=column.typecode)
+
+
+# Writers of each data format.
+FORMATS = {'csv': CsvWriter, 'binary': BinaryWriter}
+
+# Ways of running the writer that can be selected in `Metrics.open`.
+WRITERS = ['file', 'process']
+
+
+class Metrics(object):
+    """Registry of the data channels of a simulation.
+
+    Until it is opened, channels keep all their points in memory. Once
+    opened, each channel hands its points to a writer in chunks as they are
+    recorded. The writer writes them to ``[prefix].[name].csv`` or, in the
+    binary format, to the single file ``[prefix].bwr``.
+
+    Parameters
+    ----------
+    log : `Log`
+        Log to echo recorded points to.
+    disabled : list, optional
+        Kinds or names of channels not to record (the default is an empty
+        list).
+    sampling : dict, optional
+        Sampling policies by channel kind or name, e.g.
+        ``{'link.buffer': 'every:10'}`` (the default is None, which stores
+        every point). A policy set for a name applies instead of the policy
+        set for its kind, which applies instead of the policy set for
+        ``'*'``. See `parse_policy` for the policies. Policies that need
+        values cannot be set for the kind or name of channels without
+        values, and a ``'*'`` policy that needs values stores every point
+        of such channels.
+    summary : bool, optional
+        Whether to keep a `Summary` of each channel and write the summaries
+        to ``[prefix].summary.json`` when the registry is closed (the
+        default is False).
+    quantiles : list, optional
+        Kinds or names of channels to keep a `QuantileSketch` of, e.g.
+        ['flow.packet_delay']. These channels get a summary even if
+        summary is False (the default is an empty list).
+
+    Attributes
+    ----------
+    channels : list
+        All channels in the order they were created.
+
+    Methods
+    -------
+    channel(kind, name, entity=None, values=True)
+        Returns the channel with a name, creating it if needed.
+    set_enabled(key, enabled)
+        Enables or disables the channels of a kind or name.
+    set_sampling(key, policy)
+        Sets the sampling policy of the channels of a kind or name.
+    open(prefix, writer='file', data_format='csv', compression=None)
+        Starts writing the points of all channels to files.
+    flush()
+        Writes the buffered points of all channels.
+    close()
+        Writes the buffered points of all channels and closes the files.
+    """
+
+    def __init__(self, log, disabled=[], sampling=None, summary=False,
+                 quantiles=[]):
+        self._log = log.get_logger('data')
+        self._disabled = set(disabled)
+        self._summary = summary
+        self._quantiles = set(quantiles)
+        self._sampling = {}
+        if sampling is not None:
+            for key, policy in sampling.iteritems():
+                self._sampling[key] = (parse_policy(policy),
+                                       needs_values(policy))
+        self._channels = {}
+        self._prefix = None
+        self._writer = None
+        self.channels = []
+
+    def channel(self, kind, name, entity=None, values=True):
+        """Returns the channel with a name, creating it if needed.
+
+        Parameters
+        ----------
+        kind : string
+            The type of data, e.g. 'link.buffer'.
+        name : string
+            The name of the channel, e.g. 'link_L1.buffer'.
+        entity : string, optional
+            The id of the object recording the points, e.g. 'L1' (the
+            default is None).
+        values : bool, optional
+            Whether the points have values (the default is True).
+
+        Returns
+        -------
+        `Channel`
+            The channel.
+
+        Raises
+        ------
+        ValueError
+            If the sampling policy of the channel needs values and the
+            channel has none.
+        """
+        if name not in self._channels:
+            channel = Channel(kind, name, self._log, entity, values)
+            channel.enabled = (kind not in self._disabled and
+                               name not in self._disabled)
+            channel._out = self._writer
+            channel._sampler = self._sampler(channel)
+            if kind in self._quantiles or name in self._quantiles:
+                channel.summary = Summary(QuantileSketch())
+            elif self._summary:
+                channel.summary = Summary()
+            self._channels[name] = channel
+            self.channels.append(channel)
+        return self._channels[name]
+
+    def set_enabled(self, key, enabled):
+        """Enables or disables the channels of a kind or name.
+
+        Parameters
+        ----------
+        key : string
+            A channel kind or name.
+        enabled : bool
+            Whether to record the channels.
+        """
+        if enabled:
+            self._disabled.discard(key)
+        else:
+            self._disabled.add(key)
+        for channel in self.channels:
+            channel.enabled = (channel.kind not in self._disabled and
+                               channel.name not in self._disabled)
+
+    def set_sampling(self, key, policy):
+        """Sets the sampling policy of the channels of a kind or name.
+
+        Points held by the previous samplers of the channels are stored
+        first.
+
+        Parameters
+        ----------
+        key : string
+            A channel kind or name, or '*' for all channels without a more
+            specific policy.
+        policy : string
+            The sampling policy, e.g. 'every:10'. See `parse_policy`.
+
+        Raises
+        ------
+        ValueError
+            If the policy needs values and a channel it applies to has
+            none. The previous policies are kept.
+        """
+        previous = self._sampling.get(key)
+        self._sampling[key] = (parse_policy(policy), needs_values(policy))
+        channels = [channel for channel in self.channels
+                    if key in (channel.kind, channel.name, '*')]
+        try:
+            samplers = [self._sampler(channel) for channel in channels]
+        except ValueError:
+            if previous is None:
+                del self._sampling[key]
+            else:
+                self._sampling[key] = previous
+            raise
+        for channel, sampler in zip(channels, samplers):
+            channel.finish()
+            channel._sampler = sampler
+
+    def _sampler(self, channel):
+        """Returns a new sampler for a channel, or None to store all
+        points."""
+        for key in [channel.name, channel.kind, '*']:
+            if key in self._sampling:
+                make_sampler, values = self._sampling[key]
+                if values and not channel.values:
+                    if key == '*':
+                        return None
+                    raise ValueError("Sampling policy of {0} needs values, "
+                                     "but channel {1} records times "
+                                     "only.".format(key, channel.name))
+                if make_sampler is None:
+                    return None
+                return make_sampler(channel._store)
+        return None
+
+    def open(self, prefix, writer='file', data_format='csv',
+             compression=None):
+        """Starts writing the points of all channels to files.
+
+        Does nothing if the registry is already open with the same prefix.
+
+        Parameters
+        ----------
+        prefix : string
+            Path prefix of the files, e.g. 'data/case0'.
+        writer : string, optional
+            Where to run the writer, 'file' to write from this process or
+            'process' to write from a separate process (the default is
+            'file').
+        data_format : string, optional
+            The data format, 'csv' for a CSV file per channel or 'binary'
+            for a single result file (the default is 'csv').
+        compression : string, optional
+            Compression of binary result files, 'zlib' or 'bz2' (the default
+            is None).
+        """
+        if prefix == self._prefix:
+            return
+        if writer not in WRITERS:
+            raise ValueError("Unknown writer {0}.".format(writer))
+        if data_format not in FORMATS:
+            raise ValueError("Unknown data format {0}.".format(data_format))
+        if compression not in COMPRESSIONS:
+            raise ValueError("Unknown compression {0}.".format(compression))
+        if data_format == 'csv' and compression is not None:
+            raise ValueError("CSV files cannot be compressed.")
+        self.close()
+        self._prefix = prefix
+        if writer == 'process':
+            self._writer = ProcessWriter(prefix, data_format, compression)
+        else:
+            self._writer = FORMATS[data_format](prefix, compression)
+        for channel in self.channels:
+            channel._out = self._writer
+
+    def flush(self):
+        """Writes the buffered points of all channels."""
+        if self._writer is None:
+            return
+        for channel in self.channels:
+            channel.flush()
+        self._writer.flush()
+
+    def close(self):
+        """Writes the buffered points of all channels and closes the files.
+
+        Points held by samplers are stored first. The summaries of the
+        channels are written if they are kept. Channels keep their points in
+        memory again until the registry is reopened.
+        """
+        for channel in self.channels:
+            channel.finish()
+        if self._writer is None:
+            return
+        if self._summary or self._quantiles:
+            write_summary('{}.summary.json'.format(self._prefix),
+                          self.channels)
+        for channel in self.channels:
+            channel.flush()
+            channel._out = None
+        self._writer.close()
+        self._writer = None
+        self._prefix = None
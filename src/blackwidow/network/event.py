@@ -1,90 +1,94 @@
-
-
-class Event:
-    """Event object to run.
-
-    This object contains a function to run with any arguments. This is used by
-    other objects to run specific functions at some time.
+from collections import namedtuple
+
+# Event codes. The code of an event selects the method of its target that
+# the event runs.
+START_FLOW = 0
+SEND = 1
+RESEND = 2
+TIMEOUT = 3
+WINDOW_CALC = 4
+LINK_SEND = 5
+LINK_RELEASE = 6
+LINK_DELIVER = 7
+ROUTING = 8
+GRAPH_RATE = 9
+
+# Dispatch table. Entry i is the name of the method run by events with code
+# i and whether the event argument is passed to it.
+HANDLERS = [
+    ('send_packet', False),
+    ('_send', False),
+    ('send_packet', False),
+    ('_timeout', False),
+    ('_update_window', False),
+    ('_send', False),
+    ('_release', False),
+    ('_deliver', True),
+    ('start_new_routing', False),
+    ('graph', False),
+]
+
+# Descriptions of events by code. {0} is the id of the object that created
+# the event and {1} is the event argument.
+DESCRIPTIONS = [
+    "Start flow {0}",
+    "Send on flow {0}",
+    "Resend on flow {0}",
+    "Timeout on flow {0}",
+    "Start window calc on flow {0}",
+    "I am link {0}. I am ready to send packet {1.pack_id}",
+    "I am link {0}. I have begun sending packet {1.pack_id}",
+    "I am link {0}. I have sent packet {1[0].pack_id}",
+    "{0} reset its routing table.",
+    "Graph rates",
+]
+
+
+class Event(namedtuple('Event', ['code', 'target', 'arg'])):
+    """Event to run.
+
+    Events are plain records so that scheduling one allocates a single tuple
+    and the event queue can be pickled. The network looks up the method to
+    run in `HANDLERS` by the event code.
 
     Parameters
     ----------
-    type : string
-        A message specifying the type of the event.
-    src_id : string
-        The id of the source object creating the event.
-    f : func
-        The function to run.
-    kwargs : dict
-        Keyword arguments to provide to `f`.
+    code : int
+        The event code, e.g. `LINK_SEND`.
+    target : int
+        The index of the object to run the event on, as returned by
+        `Network.register`.
+    arg : object, optional
+        Argument of the event (the default is None). It is passed to the
+        handler for codes that take one, and is otherwise only used to
+        describe the event.
 
     Attributes
     ----------
-    id : string
-        The event id.
-    src_id : string
-        The id of the object that created the link.
-    type : string
-        The type of the event.
+    code : int
+        The event code.
+    target : int
+        The index of the object to run the event on.
+    arg : object
+        Argument of the event.
 
     Methods
     -------
-    run()
-        Runs the event.
-
-    Notes
-    -----
-    The event is initialized with a id. The `Event` class keeps a static id
-    that is updated for each event to create a unique id.
+    describe(src_id)
+        Returns a description of the event.
     """
 
-    # Static id to create unique ids for each event.
-    _last_id = 0
-
-    def __init__(self, type, src_id, f, **kwargs):
-        # Assign the event an id
-        self._id = Event._last_id
-        # Update the static id to use a new id for the next event.
-        Event._last_id += 1
-
-        # Initialize event attributes
-        self._type = type
-        self._f = f
-        self._kwargs = kwargs
-        self._src_id = src_id
+    __slots__ = ()
 
-    @property
-    def id(self):
-        return self._id
+    def __new__(cls, code, target, arg=None):
+        return super(Event, cls).__new__(cls, code, target, arg)
 
-    @id.setter
-    def id(self, value):
-        raise AttributeError("Cannot modify event id: {0}".format(self._id))
+    def describe(self, src_id):
+        """Returns a description of the event for debug output.
 
-    @property
-    def src_id(self):
-        return self._src_id
-
-    @src_id.setter
-    def src_id(self, value):
-        raise AttributeError("Cannot modify event"
-                             "source id: {0}".format(self._id))
-
-    @property
-    def type(self):
-        return self._type
-
-    @type.setter
-    def type(self, value):
-        raise AttributeError("Cannot modify event type: {0}".format(self._id))
-
-    def run(self):
-        """Runs the event.
-
-        Calls the function `f` with keyword arguments `kwargs`.
+        Parameters
+        ----------
+        src_id : string
+            The id of the object that created the event.
         """
-        self._f(**self._kwargs)
-
-    def __str__(self):
-        """Returns a string representation of the event."""
-        msg = "Event {0} running: {1}"
-        return msg.format(self._id, self._type)
+        return DESCRIPTIONS[self.code].format(src_id, self.arg)
@@ -0,0 +1,461 @@
+from abc import ABCMeta, abstractmethod
+import bisect
+import heapq
+from collections import deque
+
+# Bounds on the number of buckets in a `CalendarEventQueue`.
+MIN_BUCKETS = 2
+MAX_BUCKETS = 2 ** 20
+# Number of upcoming events sampled to pick a new bucket width.
+WIDTH_SAMPLE_SIZE = 25
+# Compact a queue once more than this fraction of its entries are cancelled.
+COMPACT_FRACTION = 0.5
+# Never compact queues with fewer cancelled entries than this.
+COMPACT_MIN_DEAD = 64
+
+
+class EventHandle(object):
+    """Handle to a scheduled event, returned by `Network.add_event`.
+
+    Parameters
+    ----------
+    queue : `EventQueue`
+        The queue holding the event.
+    entry : list
+        The ``[time, seq, event]`` entry of the event in the queue.
+
+    Attributes
+    ----------
+    time : float
+        The time at which the event is scheduled to run.
+    pending : bool
+        True if the event has neither run nor been cancelled.
+
+    Methods
+    -------
+    cancel()
+        Prevents the event from running.
+    """
+
+    __slots__ = ['_queue', '_entry']
+
+    def __init__(self, queue, entry):
+        self._queue = queue
+        self._entry = entry
+
+    @property
+    def time(self):
+        return self._entry[0]
+
+    @property
+    def pending(self):
+        return self._entry[2] is not None
+
+    def cancel(self):
+        """Prevents the event from running.
+
+        Does nothing if the event has already run or been cancelled.
+        """
+        self._queue.cancel(self._entry)
+
+
+class EventQueue(object):
+    """Base class for single-threaded priority queues of events.
+
+    Entries are stored as ``[time, seq, event]`` lists. `seq` increases with
+    every insertion or reservation, so events scheduled for the same time
+    run in the order they were added and `Event` objects are never compared
+    with each other. Every implementation therefore runs events in the same
+    order.
+
+    Many events are scheduled with no delay, e.g. acks and routing packets
+    leaving a link. Those are appended to a FIFO lane instead of the main
+    queue. The lane holds events for the current time only, in the order
+    they were added, so it is drained before the clock advances and each of
+    its events costs O(1). `get` compares the head of the lane with the head
+    of the main queue, so events already in the main queue for the current
+    time still run in order.
+
+    Cancelled events are not removed right away. Their entry's event is set
+    to None, making it a tombstone that is skipped when it reaches the front
+    of the queue. Once tombstones make up more than `COMPACT_FRACTION` of the
+    queue, it is compacted to drop them.
+
+    Subclasses implement the main queue with the abstract methods `_push`,
+    `_peek`, `_pop` and `_compact`.
+
+    Attributes
+    ----------
+    live : int
+        Number of events waiting to run.
+    dead : int
+        Number of cancelled entries still stored in the queue.
+    time : float
+        Time of the last event returned by `get`.
+    seq : int
+        Sequence number of the last event returned by `get`.
+
+    Methods
+    -------
+    put(time, event, seq=None)
+        Adds an event to run at time and returns an `EventHandle`.
+    get()
+        Removes and returns the earliest ``(time, event)`` pair.
+    reserve()
+        Reserves a sequence number for an event to be added later.
+    cancel(entry)
+        Marks an entry as cancelled.
+    compact()
+        Removes all cancelled entries.
+    empty()
+        Returns whether the queue has no events waiting to run.
+    clear()
+        Removes all events from the queue.
+    """
+
+    __metaclass__ = ABCMeta
+
+    def __init__(self):
+        self.clear()
+
+    def __len__(self):
+        return self.live
+
+    def put(self, time, event, seq=None):
+        """Adds an event to the queue.
+
+        Parameters
+        ----------
+        time : float
+            The absolute simulation time at which to run the event.
+        event : `Event`
+            The event to be run.
+        seq : int, optional
+            A sequence number from `reserve` (the default is None, which
+            orders the event after all events added so far).
+
+        Returns
+        -------
+        `EventHandle`
+            Handle that can be used to cancel the event.
+        """
+        if seq is None:
+            seq = self._seq
+            self._seq += 1
+            lane = self._lane
+            # The lane only holds events for a single time. It can still
+            # hold events for a later time if an earlier event was added
+            # with a negative delay.
+            if time == self.time and (not lane or lane[-1][0] == time):
+                entry = [time, seq, event]
+                lane.append(entry)
+                self.live += 1
+                return EventHandle(self, entry)
+        entry = [time, seq, event]
+        self._push(entry)
+        self.live += 1
+        return EventHandle(self, entry)
+
+    def get(self):
+        """Removes and returns the earliest event that is not cancelled.
+
+        Returns
+        -------
+        (time, event) : tuple
+            The time of the event and the event itself.
+        """
+        lane = self._lane
+        while True:
+            if lane:
+                head = self._peek()
+                if head is None or lane[0] < head:
+                    entry = lane.popleft()
+                else:
+                    entry = self._pop()
+            else:
+                entry = self._pop()
+            if entry[2] is not None:
+                break
+            self.dead -= 1
+        event = entry[2]
+        # Mark the entry as used so that cancelling it does nothing.
+        entry[2] = None
+        self.live -= 1
+        self.time = entry[0]
+        self.seq = entry[1]
+        return entry[0], event
+
+    def reserve(self):
+        """Reserves a sequence number for an event to be added later.
+
+        Passing the number to `put` orders the event as if it had been added
+        when the number was reserved.
+
+        Returns
+        -------
+        int
+            The reserved sequence number.
+        """
+        seq = self._seq
+        self._seq += 1
+        return seq
+
+    def cancel(self, entry):
+        """Marks an entry as cancelled so that its event never runs.
+
+        Parameters
+        ----------
+        entry : list
+            The ``[time, seq, event]`` entry to cancel.
+        """
+        if entry[2] is None:
+            return
+        entry[2] = None
+        self.live -= 1
+        self.dead += 1
+        if (self.dead >= COMPACT_MIN_DEAD and
+                self.dead > COMPACT_FRACTION * (self.live + self.dead)):
+            self.compact()
+
+    def compact(self):
+        """Removes all cancelled entries from the queue."""
+        self._lane = deque(entry for entry in self._lane
+                           if entry[2] is not None)
+        self._compact()
+        self.dead = 0
+
+    def empty(self):
+        """Returns True if there are no events waiting to run."""
+        return self.live == 0
+
+    def clear(self):
+        """Removes all events from the queue."""
+        self.live = 0
+        self.dead = 0
+        self.time = 0
+        self.seq = -1
+        self._seq = 0
+        self._lane = deque()
+
+    @abstractmethod
+    def _push(self, entry):
+        """Adds an entry to the main queue."""
+
+    @abstractmethod
+    def _peek(self):
+        """Returns the earliest entry in the main queue, cancelled or not,
+        or None if the main queue is empty."""
+
+    @abstractmethod
+    def _pop(self):
+        """Removes and returns the earliest entry in the main queue,
+        cancelled or not. Raises IndexError if the main queue is empty."""
+
+    @abstractmethod
+    def _compact(self):
+        """Removes all cancelled entries from the main queue."""
+
+
+class HeapEventQueue(EventQueue):
+    """Event queue backed by `heapq`.
+
+    Replaces `Queue.PriorityQueue`, which takes a lock on every operation
+    even though the simulation runs on a single thread.
+
+    Attributes
+    ----------
+    heap : list
+        Heap of ``[time, seq, event]`` entries.
+    live : int
+        Number of events waiting to run.
+    dead : int
+        Number of cancelled entries still stored in the queue.
+    time : float
+        Time of the last event returned by `get`.
+    seq : int
+        Sequence number of the last event returned by `get`.
+    """
+
+    def clear(self):
+        super(HeapEventQueue, self).clear()
+        self.heap = []
+
+    def _push(self, entry):
+        heapq.heappush(self.heap, entry)
+
+    def _peek(self):
+        if self.heap:
+            return self.heap[0]
+        return None
+
+    def _pop(self):
+        return heapq.heappop(self.heap)
+
+    def _compact(self):
+        self.heap = [entry for entry in self.heap if entry[2] is not None]
+        heapq.heapify(self.heap)
+
+
+class CalendarEventQueue(EventQueue):
+    """Calendar queue of events.
+
+    A calendar queue (R. Brown, 1988) hashes each event into one of
+    `nbuckets` buckets by its time, like days of a year on a calendar.
+    Each bucket covers `width` ms and holds its entries sorted. Events are
+    dequeued by scanning forward from the bucket of the current time, so
+    both `put` and `get` take amortized O(1) time when the bucket width
+    matches the typical spacing of events. The number of buckets doubles
+    or halves as the queue grows or shrinks, and the width is recomputed
+    from a sample of upcoming events on each resize.
+
+    Parameters
+    ----------
+    width : float, optional
+        Initial bucket width in ms (the default is 1.0).
+    nbuckets : int, optional
+        Initial number of buckets (the default is `MIN_BUCKETS`).
+
+    Attributes
+    ----------
+    width : float
+        Span of simulation time covered by each bucket, in ms.
+    buckets : list
+        List of sorted lists of ``[time, seq, event]`` entries.
+    live : int
+        Number of events waiting to run.
+    dead : int
+        Number of cancelled entries still stored in the queue.
+    time : float
+        Time of the last event returned by `get`.
+    seq : int
+        Sequence number of the last event returned by `get`.
+    """
+
+    def __init__(self, width=1.0, nbuckets=MIN_BUCKETS):
+        self._initial_width = width
+        self._initial_nbuckets = nbuckets
+        super(CalendarEventQueue, self).__init__()
+
+    def clear(self):
+        super(CalendarEventQueue, self).clear()
+        self.width = self._initial_width
+        self._nbuckets = self._initial_nbuckets
+        self.buckets = [[] for i in xrange(self._nbuckets)]
+        # Number of entries in the buckets, cancelled or not.
+        self._size = 0
+        # Scan position. No entry has a key less than this.
+        self._current = 0
+        # Bucket holding the earliest entry, if known.
+        self._head = None
+
+    def _key(self, time):
+        """Returns the index of the year-long sequence of buckets time is
+        in, i.e. the bucket number before wrapping around the calendar."""
+        return int(time // self.width)
+
+    def _push(self, entry):
+        key = self._key(entry[0])
+        bucket = self.buckets[key % self._nbuckets]
+        bisect.insort(bucket, entry)
+        self._size += 1
+        # Events may be scheduled before the last dequeued event (e.g. with
+        # a negative delay), so move the scan position back to them.
+        if key < self._current:
+            self._current = key
+        if self._head is not None and entry < self._head[0]:
+            self._head = bucket
+        if self._size > 2 * self._nbuckets and self._nbuckets < MAX_BUCKETS:
+            self._resize(2 * self._nbuckets)
+
+    def _peek(self):
+        if self._size == 0:
+            return None
+        if self._head is None:
+            self._head = self._find()
+        return self._head[0]
+
+    def _pop(self):
+        if self._size == 0:
+            raise IndexError("get from empty event queue")
+        bucket = self._head
+        if bucket is None:
+            bucket = self._find()
+        self._head = None
+        entry = bucket.pop(0)
+        self._size -= 1
+        if self._size < self._nbuckets // 2 and self._nbuckets > MIN_BUCKETS:
+            self._resize(self._nbuckets // 2)
+        return entry
+
+    def _find(self):
+        """Returns the bucket holding the earliest entry."""
+        buckets = self.buckets
+        nbuckets = self._nbuckets
+        current = self._current
+        # Scan one year of buckets starting at the current one. All entries
+        # have a key of at least self._current, so the first bucket whose
+        # earliest entry falls in the bucket's current day holds the
+        # earliest entry overall.
+        for key in xrange(current, current + nbuckets):
+            bucket = buckets[key % nbuckets]
+            if bucket and self._key(bucket[0][0]) == key:
+                self._current = key
+                return bucket
+
+        # Nothing in the next year. Jump directly to the earliest entry.
+        bucket = min((b for b in buckets if b), key=lambda b: b[0])
+        self._current = self._key(bucket[0][0])
+        return bucket
+
+    def _resize(self, nbuckets):
+        """Rebuilds the calendar with nbuckets buckets and a bucket width
+        estimated from the spacing of the next few events. Cancelled
+        entries are dropped."""
+        entries = [entry for bucket in self.buckets for entry in bucket
+                   if entry[2] is not None]
+        self.dead -= self._size - len(entries)
+        self._size = len(entries)
+        sample = heapq.nsmallest(WIDTH_SAMPLE_SIZE, entries)
+        if len(sample) > 1:
+            gap = (sample[-1][0] - sample[0][0]) / float(len(sample) - 1)
+            if gap > 0:
+                self.width = 3.0 * gap
+
+        self._nbuckets = nbuckets
+        self.buckets = [[] for i in xrange(nbuckets)]
+        for entry in entries:
+            self.buckets[self._key(entry[0]) % nbuckets].append(entry)
+        for bucket in self.buckets:
+            bucket.sort()
+        if sample:
+            self._current = self._key(sample[0][0])
+        self._head = None
+
+    def _compact(self):
+        self._resize(self._nbuckets)
+
+
+# Event queue implementations that can be selected by name.
+EVENT_QUEUES = {
+    'heap': HeapEventQueue,
+    'calendar': CalendarEventQueue,
+}
+
+
+def make_event_queue(name):
+    """Creates an empty event queue.
+
+    Parameters
+    ----------
+    name : string
+        The name of the implementation. Must be a key of `EVENT_QUEUES`.
+
+    Returns
+    -------
+    `EventQueue`
+        A new `HeapEventQueue` or `CalendarEventQueue`.
+    """
+    if name not in EVENT_QUEUES:
+        raise ValueError("Unknown event queue: {0}. Must be one"
+                         " of {1}.".format(name, sorted(EVENT_QUEUES)))
+    return EVENT_QUEUES[name]()
@@ -1,5 +1,5 @@
 from blackwidow.network.packet import AckPacket, DataPacket
-from event import Event
+from event import Event, WINDOW_CALC
 from flow import Flow
 
 
@@ -56,12 +56,31 @@ class FastFlow(Flow):
         Variance of round trip times
     RTO : float
         Retransmission timeout in ms
-    packets_sent : list
-        List of packets that have been sent but haven't had their ack received
-    packets_time_out : list
-        List of packets that have exceeded timeout and need to be resent
-    acks_arrived : set
-        Set of ack packets that have been received
+    packets_sent : `PacketSet`
+        Packets that have been sent but haven't had their ack received, in
+        the order they were first sent
+    packets_time_out : `PacketSet`
+        Packets that have exceeded timeout and need to be resent, in the
+        order they are resent
+    acks_arrived : `SequenceSet`
+        Packets whose ack has been received
+    timed_packets : `PacketSet`
+        Packets that have been sent and whose timeout is pending, in the
+        order they were last sent
+    send_times : dict
+        Time each packet in timed_packets was last sent
+    timer : `EventHandle`
+        Pending retransmission timer event, or None if the timer is stopped.
+        A flow has a single timer, which expires RTO ms after the packet in
+        timed_packets that was sent first, as if each packet had its own
+        timer.
+    timer_expires : float
+        Time at which the retransmission timer expires.
+    send_slots : deque
+        Event slots reserved for sends after ack receivals, in the order they
+        are due.
+    send_event : `EventHandle`
+        Pending event for the earliest send slot, or None if the flow is idle.
     done : int
         0 if flow isn't finished; 1 if flow is finished.
         Used to avoid decrementing flow more than once.
@@ -86,8 +105,7 @@ class FastFlow(Flow):
                       bw)
         self._alpha = 20.0
         self._gamma = 0.8
-        self.env.add_event(Event("Start window calc", self._flow_id,
-                                 self._update_window),
+        self.env.add_event(Event(WINDOW_CALC, self._target_index),
                            self._flow_start-1)
         self._total_num_pack = (int)(self._amount/(1024*8)) + 1
         self._cwnd = self._alpha
@@ -107,52 +125,64 @@ class FastFlow(Flow):
                                   self._flow_id, timestamp=self.env.time)
                 if (self._pack_num not in self._acks_arrived):
                     self._src.send(pack)
-                    print "Flow sent packet {0}".format(pack.pack_id)
-                    self.bw.record('{0}, {1}'.format(self.env.time, pack.size),
-                                   'flow_{0}.sent'.format(self.flow_id))
+                    if self._log.debug:
+                        self._log.write("Flow sent packet {0}".format(
+                            pack.pack_id))
+                    if self._sent_data.enabled:
+                        self._sent_data.record(self.env.time, pack.size)
                     self._send_rate.add_point(pack, self.env.time)
-                    self.env.add_event(Event("Timeout",
-                                             self._flow_id,
-                                             self._timeout,
-                                             pack_num=self._pack_num),
-                                       self._RTO)
+                    self._start_timer(self._pack_num)
                     # Shouldn't subtract pack.size if sent before.
                     if (self._pack_num not in self._packets_sent):
                         self._amount = self._amount - pack.size
-                        self._packets_sent.append(self._pack_num)
-                print "Flow has {0} bits left".format(self._amount)
-                if self._pack_num in self._packets_time_out:
-                    self._packets_time_out.remove(self._pack_num)
+                        self._packets_sent.add(self._pack_num)
+                if self._log.debug:
+                    self._log.write("Flow has {0} bits left".format(
+                        self._amount))
+                self._packets_time_out.discard(self._pack_num)
                 self._pack_num = self._pack_num + 1
                 # Ending behavior
                 if self._pack_num == self._total_num_pack:
-                    self._pack_num = self._packets_sent[0]
+                    self._pack_num = self._packets_sent.first()
                     self._cwnd = self._alpha
 
-                    print ("Flow {} already finished. Received timeout"
-                           " at {}.".format(self.flow_id, self.env.time))
-                    return
+                    if self._log.info:
+                        self._log.write("Flow {} already finished. Received"
+                                        " timeout at {}.".format(
+                                            self.flow_id, self.env.time))
+                    break
+        # Pending sends only do something while the window is open.
+        if self._can_send():
+            self._mark_dirty()
+
+    def _can_send(self):
+        """ Return whether send_packet would send a packet.
+        """
+        return ((self._amount > 0 or len(self._packets_sent) > 0) and
+                len(self._packets_sent) - len(self._packets_time_out) <
+                self._cwnd)
 
     def _update_window(self):
-        """ Send a packet.
+        """ Update the window size every 20 ms until the flow is done.
         """
+        if self._done:
+            return
         self._cwnd = min((((self._min_RTT / self._last_RTT) *
                           self._cwnd + self._alpha) * self._gamma +
                           (1.0-self._gamma) * self._cwnd), 2 * self._cwnd)
-        print "Flow {} window size is {}".format(self._flow_id, self._cwnd)
-        self.bw.record('{0}, {1}'.format(self.env.time, self._cwnd),
-                       'flow_{0}.window'.format(self.flow_id))
-        self.env.add_event(Event("Start window calc",
-                                 self._flow_id,
-                                 self._update_window),
-                           20)
+        if self._log.info:
+            self._log.write("Flow {} window size is {}".format(
+                self._flow_id, self._cwnd))
+        if self._window_data.enabled:
+            self._window_data.record(self.env.time, self._cwnd)
+        self._mark_dirty()
+        self.env.add_event(Event(WINDOW_CALC, self._target_index), 20)
 
     def _respond_to_ack(self):
         """ Overwrites parent Flow class' method because it shouldn't change
             window size.
         """
-        self.env.add_event(Event("Send", self._flow_id, self.send_packet),
-                           self._resend_time)
+        self._schedule_send()
 
     def _reset_window(self):
         """ This is called when a packet timeout occurs by the parent Flow
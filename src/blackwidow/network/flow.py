@@ -1,6 +1,8 @@
 from blackwidow.network.packet import AckPacket, DataPacket
 from blackwidow.network.rate_graph import Rate_Graph
-from event import Event
+from blackwidow.network.sequence import PacketSet, SequenceSet
+from collections import deque
+from event import Event, RESEND, SEND, START_FLOW, TIMEOUT
 
 # Variables for timeout calculation from
 # https://tools.ietf.org/html/rfc6298
@@ -65,12 +67,31 @@ class Flow(object):
         Variance of round trip times
     RTO : float
         Retransmission timeout in ms
-    packets_sent : list
-        List of packets that have been sent but haven't had their ack received
-    packets_time_out : list
-        List of packets that have exceeded timeout and need to be resent
-    acks_arrived : set
-        Set of ack packets that have been received
+    packets_sent : `PacketSet`
+        Packets that have been sent but haven't had their ack received, in
+        the order they were first sent
+    packets_time_out : `PacketSet`
+        Packets that have exceeded timeout and need to be resent, in the
+        order they are resent
+    acks_arrived : `SequenceSet`
+        Packets whose ack has been received
+    timed_packets : `PacketSet`
+        Packets that have been sent and whose timeout is pending, in the
+        order they were last sent
+    send_times : dict
+        Time each packet in timed_packets was last sent
+    timer : `EventHandle`
+        Pending retransmission timer event, or None if the timer is stopped.
+        A flow has a single timer, which expires RTO ms after the packet in
+        timed_packets that was sent first, as if each packet had its own
+        timer.
+    timer_expires : float
+        Time at which the retransmission timer expires.
+    send_slots : deque
+        Event slots reserved for sends after ack receivals, in the order they
+        are due.
+    send_event : `EventHandle`
+        Pending event for the earliest send slot, or None if the flow is idle.
     done : int
         0 if flow isn't finished; 1 if flow is finished
         Used to avoid decrementing flow more than once.
@@ -98,26 +119,49 @@ class Flow(object):
         self._SRTT = -1
         self._RTTVAR = 0
         self._RTO = 3000
-        self._packets_sent = []
-        self._packets_time_out = []
-        self._acks_arrived = set()
+        self._packets_sent = PacketSet()
+        self._packets_time_out = PacketSet()
+        self._acks_arrived = SequenceSet()
+        self._timed_packets = PacketSet()
+        self._send_times = {}
+        self._timer = None
+        self._timer_expires = None
+        self._send_slots = deque()
+        self._send_event = None
         self.env = env
         self.bw = bw
         self._flow_start = time*1000.0
         self._last_packet = 0
         self._done = 0
+        self._log = bw.log.get_logger('flow', flow_id)
+        self._sent_data = bw.metrics.channel(
+            'flow.sent', 'flow_{0}.sent'.format(flow_id),
+            flow_id)
+        self._received_data = bw.metrics.channel(
+            'flow.received', 'flow_{0}.received'.format(flow_id),
+            flow_id)
+        self._window_data = bw.metrics.channel(
+            'flow.window', 'flow_{0}.window'.format(flow_id),
+            flow_id)
+        self._packet_delay_data = bw.metrics.channel(
+            'flow.packet_delay', 'flow_{0}.packet_delay'.format(flow_id),
+            flow_id)
+        self._completion_data = bw.metrics.channel(
+            'flow.completion_time',
+            'flow_{0}.completion_time'.format(flow_id), flow_id)
+        self._target_index = env.register(self, flow_id)
         self._send_rate = Rate_Graph(self._flow_id,
                                      "flow {0} send rate".format(self.flow_id),
+                                     'flow.send_rate',
                                      self.env,
                                      self.bw)
         self._receive_rate = Rate_Graph(self._flow_id,
                                         "flow {0} receive"
                                         " rate".format(self.flow_id),
+                                        'flow.receive_rate',
                                         self.env,
                                         self.bw)
-        self.env.add_event(Event("Start flow",
-                                 self._flow_id,
-                                 self.send_packet),
+        self.env.add_event(Event(START_FLOW, self._target_index),
                            self._flow_start)
 
     @property
@@ -181,9 +225,12 @@ class Flow(object):
             ack_packet = AckPacket(packet.pack_id, packet.dest, packet.src,
                                    self._flow_id, timestamp=packet.timestamp)
             self._dest.send(ack_packet)
-            print "Flow sent ack packet {0}".format(packet.pack_id)
+            if self._log.debug:
+                self._log.write("Flow sent ack packet {0}".format(
+                    packet.pack_id))
         else:
-            print "Received wrong packet."
+            if self._log.debug:
+                self._log.write("Received wrong packet.")
 
     def send_packet(self):
         """ Send a packet.
@@ -196,39 +243,80 @@ class Flow(object):
                                   self._flow_id, timestamp=self.env.time)
                 if (self._pack_num not in self._acks_arrived):
                     self._src.send(pack)
-                    print "Flow sent packet {0}".format(pack.pack_id)
-                    self.bw.record('{0}, {1}'.format(self.env.time, pack.size),
-                                   'flow_{0}.sent'.format(self.flow_id))
+                    if self._log.debug:
+                        self._log.write("Flow sent packet {0}".format(
+                            pack.pack_id))
+                    if self._sent_data.enabled:
+                        self._sent_data.record(self.env.time, pack.size)
                     self._send_rate.add_point(pack, self.env.time)
-                    self.env.add_event(Event("Timeout",
-                                             self._flow_id,
-                                             self._timeout,
-                                             pack_num=self._pack_num),
-                                       self._RTO)
+                    self._start_timer(self._pack_num)
                     # Shouldn't subtract pack.size if sent before.
                     if (self._pack_num not in self._packets_sent):
                         self._amount = self._amount - pack.size
-                        self._packets_sent.append(self._pack_num)
-                print "Flow has {0} bits left".format(self._amount)
-                if self._pack_num in self._packets_time_out:
-                    self._packets_time_out.remove(self._pack_num)
+                        self._packets_sent.add(self._pack_num)
+                if self._log.debug:
+                    self._log.write("Flow has {0} bits left".format(
+                        self._amount))
+                self._packets_time_out.discard(self._pack_num)
                 self._pack_num = self._pack_num + 1
                 if self._amount <= 0:
                     break
         else:
-            # Just keep resending last few packets until done
+            # Just keep resending last few packets until done. Timed out
+            # packets are resent regardless of the window.
             while len(self._packets_time_out) > 0:
-                self._pack_num = self._packets_time_out[0]
+                self._pack_num = self._packets_time_out.first()
                 pack = DataPacket(self._pack_num, self._src, self._dest,
                                   self._flow_id, timestamp=self.env.time)
                 self._src.send(pack)
                 self._send_rate.add_point(pack, self.env.time)
-                self._packets_time_out.remove(self._pack_num)
-                self.env.add_event(Event("Timeout",
-                                         self._flow_id,
-                                         self._timeout,
-                                         pack_num=self._pack_num),
-                                   self._RTO)
+                self._packets_time_out.discard(self._pack_num)
+                self._start_timer(self._pack_num)
+        # Pending sends only do something while the window is open.
+        if self._can_send():
+            self._mark_dirty()
+
+    def _can_send(self):
+        """ Return whether send_packet would send a packet.
+        """
+        if self._amount > 0:
+            return (len(self._packets_sent) - len(self._packets_time_out) <
+                    self._cwnd)
+        return len(self._packets_time_out) > 0
+
+    def _schedule_send(self):
+        """ Send packets after resend_time ms.
+            Reserves a slot for the send instead of adding an event, so a
+            flow has at most one send event in the network at a time.
+        """
+        self._send_slots.append(self.env.reserve(self._resend_time))
+        self._mark_dirty()
+
+    def _mark_dirty(self):
+        """ Called when the flow's state changes so that a pending send may
+            send packets. Adds an event for the next send slot if the flow
+            is idle.
+        """
+        if self._send_event is not None:
+            return
+        # Sends that were due while the flow was idle would not have sent
+        # anything, so drop them.
+        position = self.env.position
+        while self._send_slots and self._send_slots[0] < position:
+            self._send_slots.popleft()
+        if self._send_slots:
+            self._send_event = self.env.add_reserved_event(
+                Event(SEND, self._target_index),
+                self._send_slots[0])
+
+    def _send(self):
+        """ Run the send in the earliest send slot.
+            The flow becomes idle if the window is still full afterwards.
+        """
+        self._send_slots.popleft()
+        self._send_event = None
+        if self._can_send():
+            self.send_packet()
 
     def receive(self, packet):
         """ Generate an ack or respond to bad packet.
@@ -239,7 +327,9 @@ class Flow(object):
         """
         # Packet arrived at destination.  Send ack.
         if packet.dest == self._dest:
-            print "Flow received packet {0}".format(packet.pack_id)
+            if self._log.debug:
+                self._log.write("Flow received packet {0}".format(
+                    packet.pack_id))
             if packet.pack_id not in self._acks_arrived:
                 self._send_ack(packet)
         # Ack arrived at source. Update window size.
@@ -251,37 +341,43 @@ class Flow(object):
             self._respond_to_ack()
             self._update_RTT(packet)
             # Update lists by removing pack_id
-            if packet.pack_id in self._packets_sent:
-                self._packets_sent.remove(packet.pack_id)
-            if packet.pack_id in self._packets_time_out:
-                self._packets_time_out.remove(packet.pack_id)
+            self._packets_sent.discard(packet.pack_id)
+            self._packets_time_out.discard(packet.pack_id)
             # Update which acks have arrived
             self._acks_arrived.add(packet.pack_id)
-            print "Flow {} received ack for packet {}".format(self._flow_id,
-                                                              packet.pack_id)
-            self.bw.record('{0}, {1}'.format(self.env.time, packet.size),
-                           'flow_{0}.received'.format(self.flow_id))
+            # The retransmission timer now expires for the remaining packets.
+            if self._send_times.pop(packet.pack_id, None) is not None:
+                self._timed_packets.discard(packet.pack_id)
+                self._restart_timer()
+            if self._log.debug:
+                self._log.write("Flow {} received ack for packet {}".format(
+                    self._flow_id, packet.pack_id))
+            if self._received_data.enabled:
+                self._received_data.record(self.env.time, packet.size)
             self._receive_rate.add_point(packet, self.env.time)
             # Check if done
             if (len(self._packets_sent) == 0 and self._amount <= 0 and
                self._done == 0):
                 self.env.decrement_flows()
                 self._done = 1
+                # Time from the start of the flow to its last ack in ms
+                if self._completion_data.enabled:
+                    self._completion_data.record(
+                        self.env.time, self.env.time - self._flow_start)
 
     def _respond_to_ack(self):
         """ Update window size.
         """
-        self.env.add_event(Event("Send",
-                                 self._flow_id,
-                                 self.send_packet),
-                           self._resend_time)
+        self._schedule_send()
         if self._cwnd < self._ssthresh:
             self._cwnd = self._cwnd + 1.0
         else:
             self._cwnd = self._cwnd + 1.0/self._cwnd
-        print "Flow {} window size is {}".format(self._flow_id, self._cwnd)
-        self.bw.record('{0}, {1}'.format(self.env.time, self._cwnd),
-                       'flow_{0}.window'.format(self.flow_id))
+        if self._log.info:
+            self._log.write("Flow {} window size is {}".format(
+                self._flow_id, self._cwnd))
+        if self._window_data.enabled:
+            self._window_data.record(self.env.time, self._cwnd)
 
     def _update_RTT(self, packet):
         """ Update last RTT and min RTT and retransmission timeout.
@@ -299,30 +395,84 @@ class Flow(object):
                             abs(self._SRTT - self._last_RTT))
             self._SRTT = (1.0 - alpha)*self._SRTT + alpha*self._last_RTT
         self._RTO = min(max(self._SRTT + max(G, K*self._RTTVAR), 1000), 5000)
-        print "RTO is {}".format(self._RTO)
+        if self._log.debug:
+            self._log.write("RTO is {}".format(self._RTO))
         if self._last_RTT < self._min_RTT:
             self._min_RTT = self._last_RTT
-        self.bw.record('{0}, {1}'.format(self.env.time,
-                                         self._last_RTT - self._min_RTT),
-                       'flow_{0}.packet_delay'.format(self.flow_id))
+        if self._packet_delay_data.enabled:
+            self._packet_delay_data.record(self.env.time,
+                                           self._last_RTT - self._min_RTT)
 
-    def _timeout(self, pack_num):
-        """ Generate an ack or respond to bad packet.
+    def _start_timer(self, pack_num):
+        """ Start the timeout of a packet that was just sent.
         Parameters
         ----------
-        pack_num : `Packet`number
-            The packet number of the packet to check for timeout.
+        pack_num : int
+            The packet number of the packet.
         """
-        if pack_num not in self._acks_arrived:
-            self.env.add_event(Event("Resend",
-                                     self._flow_id,
-                                     self.send_packet),
-                               self._resend_time)
-            # Go back n
-            if pack_num not in self._packets_time_out:
-                self._packets_time_out.append(pack_num)
-            self._pack_num = pack_num
-            self._reset_window()
+        self._timed_packets.discard(pack_num)
+        self._timed_packets.add(pack_num)
+        self._send_times[pack_num] = self.env.time
+        if self._timer is None:
+            self._restart_timer()
+
+    def _restart_timer(self):
+        """ Make the retransmission timer expire RTO ms after the packet
+            that was sent first, or stop it if no packet is waiting.
+        """
+        if len(self._timed_packets) == 0:
+            self._stop_timer()
+            return
+        oldest = self._timed_packets.first()
+        self._timer_expires = self._send_times[oldest] + self._RTO
+        # Rather than replace the timer event on every ack, a pending event
+        # reschedules itself for a later expiry time when it runs. It is
+        # only replaced if the timer now expires earlier, e.g. because RTO
+        # shrank.
+        if self._timer is not None and self._timer_expires < self._timer.time:
+            self._timer.cancel()
+            self._timer = None
+        if self._timer is None:
+            self._timer = self.env.add_event(
+                Event(TIMEOUT, self._target_index),
+                max(self._timer_expires - self.env.time, 0))
+            self._timer_expires = self._timer.time
+
+    def _stop_timer(self):
+        """ Stop the retransmission timer.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _timeout(self):
+        """ Retransmission timer event. Go back n from the packet that was
+            sent first if the timer has expired, and restart the timer for
+            the packets still waiting.
+        """
+        if self._timer_expires > self._timer.time:
+            # Timer was restarted after this event was scheduled.
+            self._timer = self.env.add_event(Event(TIMEOUT,
+                                                   self._target_index),
+                                             self._timer_expires -
+                                             self.env.time)
+            self._timer_expires = self._timer.time
+            return
+        self._timer = None
+        if len(self._timed_packets) == 0:
+            return
+        pack_num = self._timed_packets.first()
+        self._timed_packets.discard(pack_num)
+        del self._send_times[pack_num]
+        self.env.add_event(Event(RESEND, self._target_index),
+                           self._resend_time)
+        # Go back n. Only the timed out packet is marked; the packets sent
+        # after it time out on their own.
+        self._packets_time_out.add(pack_num)
+        self._pack_num = pack_num
+        self._reset_window()
+        self._restart_timer()
+        self._mark_dirty()
 
     def _reset_window(self):
         """ Called when a packet timeout occurs.
@@ -333,6 +483,8 @@ class Flow(object):
         else:
             self._ssthresh = 2.0
         self._cwnd = 1.0
-        print "Flow {} window size is {}".format(self._flow_id, self._cwnd)
-        self.bw.record('{0}, {1}'.format(self.env.time, self._cwnd),
-                       'flow_{0}.window'.format(self.flow_id))
+        if self._log.info:
+            self._log.write("Flow {} window size is {}".format(
+                self._flow_id, self._cwnd))
+        if self._window_data.enabled:
+            self._window_data.record(self.env.time, self._cwnd)
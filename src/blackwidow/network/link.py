@@ -1,6 +1,6 @@
 from blackwidow.network.rate_graph import Rate_Graph
 from collections import deque
-from event import Event
+from event import Event, LINK_DELIVER, LINK_RELEASE, LINK_SEND
 
 # Setting to use HALF_DUPLEX for sending packets
 HALF_DUPLEX = False
@@ -78,9 +78,30 @@ class Link(object):
         self._size = 0
         self._distance = delay
 
+        # Data channels
+        self._buffer_data = bw.metrics.channel(
+            'link.buffer', 'link_{0}.buffer'.format(self._id),
+            self._id)
+        self._drop_data = bw.metrics.channel(
+            'link.drop', 'link_{0}.drop'.format(self._id),
+            self._id, values=False)
+        self._sent_data = bw.metrics.channel(
+            'link.sent', 'link_{0}.sent'.format(self._id),
+            self._id)
+        self._rate_data = bw.metrics.channel(
+            'link.rate', 'link_{0}.rate'.format(self._id),
+            self._id)
+
+        # Index of the link as a target of events
+        self._target_index = env.register(self, self._id)
+
+        # Logger for link messages
+        self._log = bw.log.get_logger('link', self._id)
+
         # Recorder for rate data
         self._send_rate = Rate_Graph(self._id,
                                      "link {0} send rate".format(self._id),
+                                     'link.send_rate',
                                      self.env,
                                      self.bw)
 
@@ -177,20 +198,24 @@ class Link(object):
         """
         # Add packet to link buffer as soon as it is received.
         # Drop packet if the buffer is full
-        message = "I am link {0}. I have received "
-        if packet.is_ack:
-            message += "ACK "
-        message += "packet {1} at time {2}"
-        print message.format(self._id, packet.pack_id, self.env.time)
+        if self._log.debug:
+            message = "I am link {0}. I have received "
+            if packet.is_ack:
+                message += "ACK "
+            message += "packet {1} at time {2}"
+            self._log.write(message.format(self._id, packet.pack_id,
+                                           self.env.time))
 
         # The buffer is not yet full, so enqueue the packet
         if self._size + packet.size < self._capacity:
             self._release_into_link_buffer.appendleft(
                 [packet, source_id, self.env.time])
             self._size += packet.size
-            self.bw.record('{0}, {1}'.format(self.env.time, self._size),
-                           'link_{0}.buffer'.format(self._id))
-            print "Current size of link {}: {}".format(self._id, self._size)
+            if self._buffer_data.enabled:
+                self._buffer_data.record(self.env.time, self._size)
+            if self._log.debug:
+                self._log.write("Current size of link {}: {}".format(
+                    self._id, self._size))
 
             # If we only have one packet in the buffer, send it with no delay
             if len(self._release_into_link_buffer) == 1:
@@ -199,9 +224,10 @@ class Link(object):
 
         # The buffer is full
         else:
-            print "Packet dropped."
-            self.bw.record('{0}'.format(self.env.time),
-                           'link_{0}.drop'.format(self._id))
+            if self._log.debug:
+                self._log.write("Packet dropped.")
+            if self._drop_data.enabled:
+                self._drop_data.record(self.env.time)
 
     def _send(self):
         """Sends the first packet in the buffer across the link.
@@ -222,15 +248,8 @@ class Link(object):
         # Calculate the delay time needed to begin sending the packet.
         delay = float(packet.size) / float(self._rate)
 
-        # Create the event message
-        msg = "I am link {0}. I have begun sending "
-        if packet.is_ack:
-            msg += "ACK "
-        msg += "packet {1}"
         # Call _release after delay time to begin sending the packet.
-        self.env.add_event(Event(msg.format(self._id, packet.pack_id),
-                                 self._id,
-                                 self._release),
+        self.env.add_event(Event(LINK_RELEASE, self._target_index, packet),
                            delay)
 
     def _release(self):
@@ -255,20 +274,8 @@ class Link(object):
         self._size -= packet.size
 
         # Record the buffer size
-        self.bw.record('{0}, {1}'.format(self.env.time, self._size),
-                       'link_{0}.buffer'.format(self._id))
-
-        # Figure out which device to send to
-        if (source_id == self._device_a.network_id):
-            f = self._device_b.receive
-        else:
-            f = self._device_a.receive
-
-        # Create the event message
-        msg = "I am link {0}. I have sent "
-        if packet.is_ack:
-            msg += "ACK "
-        msg += "packet {1}"
+        if self._buffer_data.enabled:
+            self._buffer_data.record(self.env.time, self._size)
 
         # Ignore routing packet propagation so updates happen instantly.
         if packet.is_routing or packet.is_ack:
@@ -277,25 +284,21 @@ class Link(object):
             delay = self._delay
 
         # Release to device after self._delay time
-        self.env.add_event(Event(msg.format(self._id, packet.pack_id),
-                                 self._id,
-                                 f,
-                                 packet=packet),
+        self.env.add_event(Event(LINK_DELIVER, self._target_index,
+                                 (packet, source_id)),
                            delay)
 
         # Record link sent
-        self.bw.record('{0}, {1}'.format(self.env.time, packet.size),
-                       'link_{0}.sent'.format(self._id))
+        if self._sent_data.enabled:
+            self._sent_data.record(self.env.time, packet.size)
 
         # Record the link rate for packets that are not acknowledgements or
         # routing packets
-
-        if not packet.is_ack and not packet.is_routing:
-
-            self.bw.record('{0}, {1}'.format(self.env.time,
-                                             float(packet.size) /
-                                             (self.env.time - time) / 1000.0),
-                           'link_{0}.rate'.format(self._id))
+        if (not packet.is_ack and not packet.is_routing and
+                self._rate_data.enabled):
+            self._rate_data.record(self.env.time,
+                                   float(packet.size) /
+                                   (self.env.time - time) / 1000.0)
 
         # Process the next packet in the buffer
         if len(self._release_into_link_buffer) > 0:
@@ -313,18 +316,27 @@ class Link(object):
             else:
                 delay = 0
 
-            # Create the event message
-            msg = "I am link {0}. I am ready to send "
-            if next_packet.is_ack:
-                msg += "ACK "
-            msg += "packet {1}"
-
             # Begin sending the next packet after delay time
-            self.env.add_event(Event(msg.format(self._id, next_packet.pack_id),
-                                     self._id,
-                                     self._send),
+            self.env.add_event(Event(LINK_SEND, self._target_index,
+                                     next_packet),
                                delay)
 
+    def _deliver(self, packet_info):
+        """Delivers a packet that has crossed the link to the receiving
+        `Device`.
+
+        Parameters
+        ----------
+        packet_info : tuple
+            The packet and the id of the `Device` that sent it.
+        """
+        packet, source_id = packet_info
+        # Figure out which device to send to
+        if (source_id == self._device_a.network_id):
+            self._device_b.receive(packet)
+        else:
+            self._device_a.receive(packet)
+
     def get_buffer_size(self):
         """Returns the buffer size in bits."""
         total_size = 0
@@ -5,7 +5,9 @@ from flow import Flow
 from tahoe_flow import TahoeFlow
 from reno_flow import RenoFlow
 from fast_flow import FastFlow
-from Queue import PriorityQueue
+from rate_graph import RateSampler
+from event import HANDLERS
+from event_queue import make_event_queue
 import networkx as nx
 import matplotlib.pyplot as plt
 
@@ -32,6 +34,11 @@ class Network():
     ----------
     time : float
         The currenet simulation time.
+    position : tuple
+        The ``(time, seq)`` slot of the event that is running. Slots of
+        events order them in the same way as the event queue.
+    rate_sampler : `RateSampler`
+        Records the rates of all `Rate_Graph` objects of the network.
     """
     def __init__(self, bw):
         self.devices = {}
@@ -42,10 +49,17 @@ class Network():
         self.ids = []
         self._time = 0
         self.bw = bw
-        self._events = PriorityQueue()
+        self._events = make_event_queue(bw.event_queue)
         self.num_flows_active = 0
         self.g = nx.MultiDiGraph()
         self.deleted = []
+        # Objects that events run on, the ids of their owners and the
+        # loggers describing their events.
+        self._targets = []
+        self._target_ids = []
+        self._target_logs = []
+        # Records the rates of all rate graphs.
+        self.rate_sampler = RateSampler(self)
 
     @property
     def time(self):
@@ -55,6 +69,10 @@ class Network():
     def time(self, value):
         raise AttributeError("Cannot modify network time")
 
+    @property
+    def position(self):
+        return (self._time, self._events.seq)
+
     def check_id(self, obj_id):
         """Check if the id is not already used.
 
@@ -345,7 +363,28 @@ class Network():
 
     def empty(self):
         """Empties the event queue."""
-        self._events = PriorityQueue()
+        self._events.clear()
+
+    def register(self, target, src_id):
+        """Registers an object that events can run on.
+
+        Parameters
+        ----------
+        target : object
+            The object to run events on.
+        src_id : string
+            The id of the object owning target. Events on target are dropped
+            once this id is deleted.
+
+        Returns
+        -------
+        int
+            The index of target, used as the target of its events.
+        """
+        self._targets.append(target)
+        self._target_ids.append(src_id)
+        self._target_logs.append(self.bw.log.get_logger('event', src_id))
+        return len(self._targets) - 1
 
     def add_event(self, event, delay):
         """
@@ -360,10 +399,62 @@ class Network():
         delay : float
             The amount of time in ms to wait before running the event.
 
+        Returns
+        -------
+        `EventHandle`
+            Handle that can be used to cancel the event.
         """
         # Add the event to the queue with key equal to the time to run the
         # event.
-        self._events.put((self._time + delay, event))
+        return self._events.put(self._time + delay, event)
+
+    def reserve(self, delay):
+        """Reserves a place in the event order for an event to be added later.
+
+        An event added with the returned slot using `add_reserved_event` runs
+        as if it had been added with `add_event` at the time of reservation.
+        This lets objects keep their own list of upcoming work and only add
+        an event for the earliest item.
+
+        Parameters
+        ----------
+        delay : float
+            The amount of time in ms to wait before running the event.
+
+        Returns
+        -------
+        slot : tuple
+            The ``(time, seq)`` slot of the event.
+        """
+        return (self._time + delay, self._events.reserve())
+
+    def add_reserved_event(self, event, slot):
+        """Adds an event to the queue in a slot returned by `reserve`.
+
+        Parameters
+        ----------
+        event : `Event`
+            The event to be run.
+        slot : tuple
+            The ``(time, seq)`` slot of the event.
+
+        Returns
+        -------
+        `EventHandle`
+            Handle that can be used to cancel the event.
+        """
+        return self._events.put(slot[0], event, slot[1])
+
+    def event_counts(self):
+        """Returns the number of events in the queue.
+
+        Returns
+        -------
+        (live, dead) : tuple
+            The number of events waiting to run and the number of cancelled
+            events that are still stored in the queue.
+        """
+        return self._events.live, self._events.dead
 
     def to_json(self):
         """Returns a JSON representation of the network."""
@@ -416,6 +507,23 @@ class Network():
             The amount of time taken for the network to run.
         """
 
+        # Write data to files as it is recorded.
+        self.bw.open_data()
+
+        try:
+            self._run_events()
+        finally:
+            self.bw.log.flush()
+            # Keep the data recorded so far if the run fails.
+            self.bw.metrics.flush()
+
+        # Return end time.
+        self.bw.write()
+        return self._time
+
+    def _run_events(self):
+        """Runs events until the queue is empty or there are 0 flows active.
+        """
         # Keep running while we have events to run and there are active flows.
         # The first events will be enqueued by the flows when they are
         # initialized.
@@ -423,22 +531,29 @@ class Network():
 
             # Get the event and time
             (time, current_event) = self._events.get()
+            target = current_event.target
 
             # Don't run the event if it source has been deleted
-            if current_event.src_id in self.deleted:
+            src_id = self._target_ids[target]
+            if src_id in self.deleted:
                 continue
 
-            print ("{0} at time {1} with {2} "
-                   "flows active".format(str(current_event),
-                                         time,
-                                         self.num_flows_active))
+            # Events are only described if their logger asks for it, so that
+            # no strings are formatted for them otherwise.
+            log = self._target_logs[target]
+            if log.debug:
+                log.write("{0} at time {1} with {2} flows "
+                          "active".format(current_event.describe(src_id),
+                                          time,
+                                          self.num_flows_active))
 
             # Update the current time
             self._time = time
 
             # Run the event
-            current_event.run()
-
-        # Return end time.
-        self.bw.write()
-        return self._time
+            name, takes_arg = HANDLERS[current_event.code]
+            handler = getattr(self._targets[target], name)
+            if takes_arg:
+                handler(current_event.arg)
+            else:
+                handler()
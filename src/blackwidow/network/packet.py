@@ -5,10 +5,25 @@
 DATA_PACKET_SIZE = 1024 * 8
 ACK_PACKET_SIZE = 64 * 8 * 0
 
+# Packets raise on attribute assignment, so their fields are only set by
+# their constructors through object's __setattr__.
+_set = object.__setattr__
+
+
+def _slot_names(cls):
+    """Returns the names of the slots of a packet class and its bases."""
+    return [name for klass in cls.__mro__
+            for name in klass.__dict__.get('__slots__', [])]
+
 
 class Packet(object):
     """Super class for DataPackets and AckPackets
 
+    Packets are immutable. Their fields are set when they are created and
+    assigning any attribute raises AttributeError. Fields are slots, and
+    attributes that are the same for all packets of a class, like the size
+    of data packets, are class attributes, so packets have no __dict__.
+
     Parameters
     ----------
     packet_id : int
@@ -48,99 +63,44 @@ class Packet(object):
         Size in bits of packet.
     """
 
+    __slots__ = ['pack_id', 'src', 'dest', 'flow_id', 'timestamp']
+
+    # Attributes that are the same for all packets of a class
+    is_ack = False
+    is_routing = False
+    size = 0
+
     def __init__(self, packet_id, src, dest, flow_id, timestamp=0):
         """ Constructor for host class
         """
-        self._pack_id = packet_id
-        self._src = src
-        self._dest = dest
-        self._flow_id = flow_id
-        self._is_ack = False
-        self._is_routing = False
-        self._size = 0
-        self._timestamp = timestamp
+        _set(self, 'pack_id', packet_id)
+        _set(self, 'src', src)
+        _set(self, 'dest', dest)
+        _set(self, 'flow_id', flow_id)
+        _set(self, 'timestamp', timestamp)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Cannot modify packet"
+                             " {0}: {1}".format(name, self.pack_id))
+
+    def __getstate__(self):
+        return dict((name, getattr(self, name))
+                    for name in _slot_names(type(self)))
+
+    def __setstate__(self, state):
+        for name, value in state.iteritems():
+            _set(self, name, value)
 
     def __str__(self):
         """ Returns a string of which packet is being sent and where.
             Called by link.
         """
         msg = ""
-        if self._is_ack:
+        if self.is_ack:
             msg += "ACK "
         msg += "Packet {0} sending from {1} to {2}"
-        return msg.format(self._pack_id, self._src.network_id,
-                          self._dest.network_id)
-
-    @property
-    def timestamp(self):
-        return self._timestamp
-
-    @timestamp.setter
-    def timestamp(self, value):
-        raise AttributeError("Cannot modify"
-                             " timestamp: {0}".format(self._pack_id))
-
-    @property
-    def pack_id(self):
-        return self._pack_id
-
-    @pack_id.setter
-    def pack_id(self, value):
-        raise AttributeError("Cannot modify packet"
-                             " id: {0}".format(self._pack_id))
-
-    @property
-    def src(self):
-        return self._src
-
-    @src.setter
-    def src(self, value):
-        raise AttributeError("Cannot modify packet"
-                             " source: {0}".format(self._src))
-
-    @property
-    def dest(self):
-        return self._dest
-
-    @dest.setter
-    def dest(self, value):
-        raise AttributeError("Cannot modify packet id: {0}".format(self._dest))
-
-    @property
-    def flow_id(self):
-        return self._flow_id
-
-    @flow_id.setter
-    def flow_id(self, value):
-        raise AttributeError("Cannot modify packet"
-                             " flow id: {0}".format(self._dest))
-
-    @property
-    def is_ack(self):
-        return self._is_ack
-
-    @is_ack.setter
-    def is_ack(self, value):
-        raise AttributeError("Cannot modify packet"
-                             " type: {0}".format(self._pack_id))
-
-    @property
-    def is_routing(self):
-        return self._is_routing
-
-    @is_routing.setter
-    def is_routing(self, value):
-        raise AttributeError("Cannot modify packet"
-                             " type: {0}".format(self._pack_id))
-
-    @property
-    def size(self):
-        return self._size
-
-    @size.setter
-    def size(self, value):
-        raise AttributeError("Cannot modify packet"
-                             " size: {0}".format(self._pack_id))
+        return msg.format(self.pack_id, self.src.network_id,
+                          self.dest.network_id)
 
 
 class DataPacket(Packet):
@@ -185,11 +145,9 @@ class DataPacket(Packet):
         Size in bits of packet.
     """
 
-    def __init__(self, packet_id, src, dest, flow_id, timestamp=0):
-        """Constructor for DataPacket class"""
-        super(DataPacket, self).__init__(packet_id, src, dest, flow_id,
-                                         timestamp)
-        self._size = DATA_PACKET_SIZE
+    __slots__ = []
+
+    size = DATA_PACKET_SIZE
 
 
 class AckPacket(Packet):
@@ -238,23 +196,17 @@ class AckPacket(Packet):
         The next packet that the destination expects from the source.
     """
 
-    @property
-    def next_expected(self):
-        return self._next_expected
+    __slots__ = ['next_expected']
 
-    @next_expected.setter
-    def next_expected(self, value):
-        raise AttributeError("Cannot modify ack"
-                             " data: {0}".format(self._pack_id))
+    is_ack = True
+    size = ACK_PACKET_SIZE
 
     def __init__(self, packet_id, src, dest, flow_id, next_expected_id=0,
                  timestamp=0):
         """Constructor for AckPackets class"""
         super(AckPacket, self).__init__(packet_id, src, dest, flow_id,
                                         timestamp)
-        self._size = ACK_PACKET_SIZE
-        self._is_ack = True
-        self._next_expected = next_expected_id
+        _set(self, 'next_expected', next_expected_id)
 
 
 class RoutingPacket(Packet):
@@ -298,18 +250,12 @@ class RoutingPacket(Packet):
         Routing table to be updated
     """
 
+    __slots__ = ['routing_table', 'size']
+
+    is_routing = True
+
     def __init__(self, packet_id, src, dest, flow_id, routing_table, size):
         """Constructor for RoutingPacket class"""
         super(RoutingPacket, self).__init__(packet_id, src, dest, flow_id)
-        self._size = size
-        self._is_routing = True
-        self._routing_table = routing_table
-
-    @property
-    def routing_table(self):
-        return self._routing_table
-
-    @routing_table.setter
-    def routing_table(self, value):
-        raise AttributeError("Cannot modify"
-                             " routing table: {0}".format(self._pack_id))
+        _set(self, 'size', size)
+        _set(self, 'routing_table', routing_table)
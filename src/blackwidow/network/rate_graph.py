@@ -1,62 +1,218 @@
-from blackwidow.network.packet import Packet
-from event import Event
-from Queue import PriorityQueue
+from collections import deque
+from event import Event, GRAPH_RATE
+import math
+import numpy as np
 
+# Default length of the window rates are averaged over, in ms.
+WINDOW_SIZE = 1000
 
-class Data(object):
-    """ Class to represent an amount of data and the time it was sent.
-    It is used as a priority queue object with time as the priority.
+# Default interval between rate points, in ms.
+INTERVAL = 100
+
+
+class RateSampler(object):
+    """Samples the rates of all `Rate_Graph` objects of a network.
+
+    The windows of all rate graphs are kept in shared lists: the
+    ``(time, size)`` points of each window and the number of bits in it. A
+    single recurring event expires old points from every window, computes
+    all rates with one NumPy division and records them, instead of one event
+    per rate graph.
+
+    Samples are taken every interval ms, starting window_size ms after the
+    first rate graph is added. A rate graph is first recorded at the first
+    sample at least window_size ms after it was added. Rate graphs of
+    deleted objects are no longer sampled.
+
+    A rate graph whose window is empty is recorded once with a rate of 0
+    and then sleeps, e.g. once its flow is done or while its link carries
+    no traffic, and the sampler stops its event while all rate graphs
+    sleep. When a point is added to a sleeping rate graph, a rate of 0 is
+    recorded at the last sample time it missed, so the gap reads as zeros
+    in a single point, and it is sampled again from the next sample time
+    on.
 
     Parameters
     ----------
-    time : float
-        Represents the network time this object was transferred.
-    size : int
-        The number of bits this object represents
+    env : `Network`
+        The network the rate graphs belong to.
+    window_size : float, optional
+        ms to average over (the default is `WINDOW_SIZE`).
+    interval : float, optional
+        Record a rate every interval ms (the default is `INTERVAL`).
 
     Attributes
     ----------
-    time : float
-        Represents the network time this object was transferred.
-    size : int
-        The number of bits this object represents
+    window_size : float
+        ms to average over.
+    interval : float
+        Record a rate every interval ms.
+    graphs : list
+        The rate graphs sampled, in the order they were added.
+    windows : list
+        Window of each rate graph, a deque of ``(time, size)`` points.
+    bits : list
+        Number of bits in the window of each rate graph.
+    idle_since : list
+        Time each rate graph was last recorded at if it sleeps, otherwise
+        None.
+
+    Methods
+    -------
+    add(graph)
+        Adds a rate graph and gives it its slot in the shared lists.
+    wake(slot)
+        Samples a sleeping rate graph again.
+    graph()
+        Records the current rate of every rate graph that does not sleep.
     """
-    def __init__(self, time, size):
-        self._time = time
-        self._size = size
 
-    @property
-    def time(self):
-        return self._time
+    def __init__(self, env, window_size=WINDOW_SIZE, interval=INTERVAL):
+        self.env = env
+        self.window_size = window_size
+        self.interval = interval
+        self.graphs = []
+        self.windows = []
+        self.bits = []
+        self.idle_since = []
+        # Time each rate graph is first recorded at
+        self._starts = []
+        # Time of the next sample, which is pending if scheduled is True
+        self._next_sample = None
+        self._scheduled = False
+        self._target_index = env.register(self, None)
 
-    @time.setter
-    def time(self, value):
-        raise AttributeError("Cannot change time")
+    def add(self, graph):
+        """Adds a rate graph and gives it its slot in the shared lists.
 
-    @property
-    def size(self):
-        return self._size
+        Sets the slot and window of the rate graph, which start empty.
+
+        Parameters
+        ----------
+        graph : `Rate_Graph`
+            The rate graph.
+        """
+        self.graphs.append(graph)
+        self.windows.append(deque())
+        self.bits.append(0)
+        self.idle_since.append(None)
+        self._starts.append(self.env.time + self.window_size)
+        graph._sampler_slot = len(self.graphs) - 1
+        graph._window = self.windows[-1]
+        if self._next_sample is None:
+            self._next_sample = self.env.time + self.window_size
+        self._schedule()
+
+    def wake(self, slot):
+        """Samples a sleeping rate graph again.
+
+        Records a rate of 0 at the last sample time the rate graph missed,
+        if any.
+
+        Parameters
+        ----------
+        slot : int
+            Index of the rate graph.
+        """
+        idle_since = self.idle_since[slot]
+        self.idle_since[slot] = None
+        self._schedule()
+        missed = self._next_sample - self.interval
+        graph = self.graphs[slot]
+        if missed > idle_since and graph._rate_data.enabled:
+            graph._rate_data.record(missed, 0.0)
+
+    def _schedule(self):
+        """Schedules the next sample if the sampler sleeps.
+
+        Samples stay on the times they would have had without sleeping.
+        """
+        if self._scheduled:
+            return
+        time = self.env.time
+        if self._next_sample < time:
+            missed = math.ceil((time - self._next_sample) / self.interval)
+            self._next_sample += missed * self.interval
+        self._scheduled = True
+        self.env.add_event(Event(GRAPH_RATE, self._target_index),
+                           self._next_sample - time)
+
+    def _remove_deleted(self):
+        """Stops sampling the rate graphs of deleted objects.
 
-    @size.setter
-    def size(self, value):
-        raise AttributeError("Cannot change size")
+        Removed rate graphs lose their slot and window.
+        """
+        deleted = set(self.env.deleted)
+        keep = [slot for slot, graph in enumerate(self.graphs)
+                if graph.object_id not in deleted]
+        if len(keep) == len(self.graphs):
+            return
+        for graph in self.graphs:
+            if graph.object_id in deleted:
+                graph._sampler_slot = None
+                graph._window = None
+        self.graphs = [self.graphs[slot] for slot in keep]
+        self.windows = [self.windows[slot] for slot in keep]
+        self.bits = [self.bits[slot] for slot in keep]
+        self.idle_since = [self.idle_since[slot] for slot in keep]
+        self._starts = [self._starts[slot] for slot in keep]
+        for slot, graph in enumerate(self.graphs):
+            graph._sampler_slot = slot
+
+    def graph(self):
+        """Records the current rate of every rate graph that does not
+        sleep.
+        """
+        self._scheduled = False
+        if self.env.deleted:
+            self._remove_deleted()
 
-    def __cmp__(self, other):
-        """Method to compare with other objects in the priority queue."""
+        # Sample at the scheduled time rather than the event time, which
+        # can differ by rounding after the sampler slept.
+        time = self._next_sample
+        cutoff = time - self.window_size
+        bits = self.bits
+        for slot, window in enumerate(self.windows):
+            while window and window[0][0] < cutoff:
+                bits[slot] -= window.popleft()[1]
 
-        return cmp(self._time, other.time)
+        rates = np.array(bits, dtype=float) / float(self.window_size)
+        idle_since = self.idle_since
+        awake = False
+        for slot, rate in enumerate(rates.tolist()):
+            if idle_since[slot] is not None:
+                continue
+            if self._starts[slot] > time:
+                awake = True
+                continue
+            graph = self.graphs[slot]
+            if graph._rate_data.enabled:
+                graph._rate_data.record(time, rate)
+            if bits[slot] == 0:
+                idle_since[slot] = time
+            else:
+                awake = True
+
+        self._next_sample = time + self.interval
+        if awake:
+            self._schedule()
 
 
 class Rate_Graph(object):
     """ Class to graph rates.
 
+    Rate graphs keep their window in the `RateSampler` of the network,
+    which records the rates of all rate graphs together.
+
     Parameters
     ----------
     object_id : string
         The id of the object recording.
     name : string
         The name of this Rate_Graph. Should specify which flow, link, or device
-        is using it.
+        is using it. Rates are recorded in the data channel with this name.
+    kind : string
+        The kind of the data channel, e.g. 'link.send_rate'.
     env : `Network`
         The network that the flow belongs to.
     bw : Blackwidow
@@ -73,31 +229,40 @@ class Rate_Graph(object):
         The network that the flow belongs to.
     bw : Blackwidow
         The printer to print data to
-    window_size : float
-        ms to average over
     bits_in_window : int
         Number of bits that were sent in the last window_size ms
-    interval : float
-        Record a data point every interval ms.
-    window : PriorityQueue
-        Keeps track of each object recorded within last window_size ms.
+    window : deque
+        ``(time, size)`` of each packet recorded within the last
+        window_size ms, oldest first. Points are added at the current
+        network time, so the window stays sorted and old points are removed
+        from the left.
     """
-    def __init__(self, object_id, name, env, bw):
+    def __init__(self, object_id, name, kind, env, bw):
         """ Constructor for Rate_Graph class
         """
         self.name = name
         self.env = env
         self.bw = bw
         self.object_id = object_id
-        self.window_size = 1000
-        self.window = PriorityQueue()
-        self.bits_in_window = 0
-        # Interval between points
-        self.interval = 100
-        self.env.add_event(Event("Graph rate",
-                                 self.object_id,
-                                 self.graph),
-                           self.window_size)
+        self._rate_data = bw.metrics.channel(kind, name, object_id)
+        self._sampler = env.rate_sampler
+        self._sampler.add(self)
+
+    @property
+    def window(self):
+        return self._window
+
+    @window.setter
+    def window(self, value):
+        raise AttributeError("Cannot change window")
+
+    @property
+    def bits_in_window(self):
+        return self._sampler.bits[self._sampler_slot]
+
+    @bits_in_window.setter
+    def bits_in_window(self, value):
+        raise AttributeError("Cannot change bits_in_window")
 
     def add_point(self, packet, time):
         """ Adds a point to the queue
@@ -108,35 +273,9 @@ class Rate_Graph(object):
         time : float
             The network's current time.
         """
-        self.window.put(Data(time, packet.size))
-        self.bits_in_window = self.bits_in_window + packet.size
-
-    def remove_points(self, time):
-        """ Removes data before time
-        Parameters
-        ----------
-        time : float
-            The network's current time.
-        """
-        while ((not self.window.empty()) and self.peek_time() < time):
-            first = self.window.get()
-            self.bits_in_window = self.bits_in_window - first.size
-
-    def peek_time(self):
-        """ Return the time of the first object in the queue
-        """
-        temp = self.window.get()
-        self.window.put(temp)
-        return temp.time
-
-    def graph(self):
-        """ Graphs current rate
-        """
-        self.remove_points(self.env.time-self.window_size)
-        current_rate = float(self.bits_in_window)/float(self.window_size)
-        self.bw.record('{0}, {1}'.format(self.env.time, current_rate),
-                       '{0}'.format(self.name))
-        self.env.add_event(Event("Graph rate",
-                                 self.object_id,
-                                 self.graph),
-                           self.interval)
+        self._window.append((time, packet.size))
+        sampler = self._sampler
+        slot = self._sampler_slot
+        sampler.bits[slot] += packet.size
+        if sampler.idle_since[slot] is not None:
+            sampler.wake(slot)
@@ -1,5 +1,6 @@
 from blackwidow.network.packet import AckPacket, DataPacket
-from event import Event
+from event import Event, RESEND
+from sequence import SequenceSet
 from tahoe_flow import TahoeFlow
 
 
@@ -58,12 +59,31 @@ class RenoFlow(TahoeFlow):
         Variance of round trip times
     RTO : float
         Retransmission timeout in ms
-    packets_sent : list
-        List of packets that have been sent but haven't had their ack received
-    packets_time_out : list
-        List of packets that have exceeded timeout and need to be resent
-    acks_arrived : set
-        Set of ack packets that have been received
+    packets_sent : `PacketSet`
+        Packets that have been sent but haven't had their ack received, in
+        the order they were first sent
+    packets_time_out : `PacketSet`
+        Packets that have exceeded timeout and need to be resent, in the
+        order they are resent
+    acks_arrived : `SequenceSet`
+        Packets whose ack has been received
+    timed_packets : `PacketSet`
+        Packets that have been sent and whose timeout is pending, in the
+        order they were last sent
+    send_times : dict
+        Time each packet in timed_packets was last sent
+    timer : `EventHandle`
+        Pending retransmission timer event, or None if the timer is stopped.
+        A flow has a single timer, which expires RTO ms after the packet in
+        timed_packets that was sent first, as if each packet had its own
+        timer.
+    timer_expires : float
+        Time at which the retransmission timer expires.
+    send_slots : deque
+        Event slots reserved for sends after ack receivals, in the order they
+        are due.
+    send_event : `EventHandle`
+        Pending event for the earliest send slot, or None if the flow is idle.
     done : int
         0 if flow isn't finished; 1 if flow is finished
         Used to avoid decrementing flow more than once.
@@ -73,10 +93,9 @@ class RenoFlow(TahoeFlow):
     receive_rate : Rate_Graph
         Keeps track of the rate the flow is receiving at and outputs to CSV
         file in real time.
-    packets_arrived : list
-        Keeps track of packets(not acks) that have not arrived. Filled with all
-        possible packet numbers when the flow starts and numbers are removed as
-        each packet reaches the destination
+    packets_arrived : `SequenceSet`
+        Keeps track of packets(not acks) that have arrived at the destination.
+        Its next_missing packet is the next packet the destination expects.
     total_num_packets : int
         Total number of packets that need to be sent
     last_pack_rec : int
@@ -90,8 +109,7 @@ class RenoFlow(TahoeFlow):
         TahoeFlow.__init__(self, flow_id, source, destination, amount, env,
                            time, bw)
         self._ssthresh = 1000
-        self._packets_arrived = []
-        self._packets_arrived = range(0, (int)(self._amount/(1024*8)))
+        self._packets_arrived = SequenceSet()
         self._total_num_pack = (int)(self._amount/(1024*8)) + 1
         self._last_pack_rec = -1
         self._counter = 0
@@ -101,17 +119,20 @@ class RenoFlow(TahoeFlow):
         """ Creates ack for packet.
         """
         if self._src == packet.src and self._dest == packet.dest:
-            if len(self._packets_arrived) > 0:
-                next_ack_expected = self._packets_arrived[0]
-            else:
+            next_ack_expected = self._packets_arrived.next_missing
+            if next_ack_expected >= self._total_num_pack - 1:
+                # All packets arrived.
                 next_ack_expected = self._total_num_pack
             ack_packet = AckPacket(packet.pack_id, packet.dest, packet.src,
                                    self._flow_id, next_ack_expected,
                                    timestamp=packet.timestamp)
             self._dest.send(ack_packet)
-            print "Flow sent ack packet {0}".format(packet.pack_id)
+            if self._log.debug:
+                self._log.write("Flow sent ack packet {0}".format(
+                    packet.pack_id))
         else:
-            print "Received wrong packet."
+            if self._log.debug:
+                self._log.write("Received wrong packet.")
 
     def receive(self, packet):
         """ Generate an ack or respond to bad packet.
@@ -121,9 +142,10 @@ class RenoFlow(TahoeFlow):
             The packet to be received.
         """
         if packet.dest == self._dest:
-            print "Flow received packet {0}".format(packet.pack_id)
-            if packet.pack_id in self._packets_arrived:
-                self._packets_arrived.remove(packet.pack_id)
+            if self._log.debug:
+                self._log.write("Flow received packet {0}".format(
+                    packet.pack_id))
+            self._packets_arrived.add(packet.pack_id)
             self._send_ack(packet)
         else:
             # Check for duplicate acknowledgements
@@ -133,12 +155,13 @@ class RenoFlow(TahoeFlow):
                 if self._counter >= 3:
                     # window deflation on non-dup ACK
                     self._cwnd = self._ssthresh
-                    print ("Flow {} window size is {} -"
-                           " fast retransmit".format(self._flow_id,
-                                                     self._cwnd))
-                    self.bw.record('{0}, {1}'.format(self.env.time,
-                                                     self._cwnd),
-                                   'flow_{0}.window'.format(self.flow_id))
+                    if self._log.info:
+                        self._log.write("Flow {} window size is {} - fast"
+                                        " retransmit".format(self._flow_id,
+                                                             self._cwnd))
+                    if self._window_data.enabled:
+                        self._window_data.record(self.env.time, self._cwnd)
+                    self._mark_dirty()
                 self._counter = 0
                 self._last_pack_rec = packet.next_expected
             # Fast retransmit/Fast recovery
@@ -151,16 +174,15 @@ class RenoFlow(TahoeFlow):
                 self._pack_num = packet.next_expected
                 # window inflation where ndup = 3
                 self._cwnd = self._ssthresh + self._counter
-                if packet.next_expected not in self._packets_time_out:
-                    self._packets_time_out.append(packet.next_expected)
-                self.env.add_event(Event("Resend",
-                                         self._flow_id,
-                                         self.send_packet),
-                                   100)
-                print ("Flow {} window size is {} -"
-                       " fast retransmit".format(self._flow_id, self._cwnd))
-                self.bw.record('{0}, {1}'.format(self.env.time, self._cwnd),
-                               'flow_{0}.window'.format(self.flow_id))
+                self._packets_time_out.add(packet.next_expected)
+                self.env.add_event(Event(RESEND, self._target_index), 100)
+                if self._log.info:
+                    self._log.write("Flow {} window size is {} - fast"
+                                    " retransmit".format(self._flow_id,
+                                                         self._cwnd))
+                if self._window_data.enabled:
+                    self._window_data.record(self.env.time, self._cwnd)
+                self._mark_dirty()
             self._receive_ack(packet)
 
     def _reset_window(self):
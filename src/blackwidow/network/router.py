@@ -1,6 +1,6 @@
 from device import Device
 from packet import RoutingPacket
-from event import Event
+from event import Event, ROUTING
 from blackwidow.network.rate_graph import Rate_Graph
 
 ROUTING_PKT_ID = 'Routing Packet'
@@ -63,18 +63,18 @@ class Router(Device):
         self._new_routing_table = {}
         self._send_rate = Rate_Graph(router_id,
                                      "router {0} send rate".format(router_id),
+                                     'router.send_rate',
                                      self.env,
                                      self.bw)
         self._receive_rate = Rate_Graph(router_id,
                                         "router {0} receive"
                                         " rate".format(router_id),
+                                        'router.receive_rate',
                                         self.env,
                                         self.bw)
-        self.env.add_event(Event("{} sent routing"
-                                 " packet".format(self._network_id),
-                                 self._network_id,
-                                 self.start_new_routing),
-                           0)
+        self._log = bw.log.get_logger('router', router_id)
+        self._target_index = env.register(self, router_id)
+        self.env.add_event(Event(ROUTING, self._target_index), 0)
 
     def add_link(self, link):
         """Overrides Device.add_link() to add to routing table.
@@ -132,8 +132,9 @@ class Router(Device):
         self._receive_rate.add_point(packet, self.env.time)
         if packet.is_routing:
             self.update_route(packet)
-            print "{} received routing packet from {}".format(self._network_id,
-                                                              packet.src)
+            if self._log.debug:
+                self._log.write("{} received routing packet from {}".format(
+                    self._network_id, packet.src))
         else:
             self.send(packet)
 
@@ -156,17 +157,9 @@ class Router(Device):
                     {'link': link, 'distance': self._distance(link)}
             self._routing_table = self._new_routing_table
             if self.env.time < 500:
-                self.env.add_event(Event("{} reset its routing"
-                                     " table.".format(self._network_id),
-                                     self._network_id,
-                                     self.start_new_routing),
-                                   10)
+                self.env.add_event(Event(ROUTING, self._target_index), 10)
             else:
-                self.env.add_event(Event("{} reset its routing"
-                                     " table.".format(self._network_id),
-                                     self._network_id,
-                                     self.start_new_routing),
-                                   5000)
+                self.env.add_event(Event(ROUTING, self._target_index), 5000)
 
         self.send_routing()
 
@@ -183,7 +176,9 @@ class Router(Device):
                                        self._new_routing_table,
                                        self.bw.routing_packet_size)
                 link.receive(packet, self._network_id)
-                print "Sent routing packet from {}".format(self._network_id)
+                if self._log.debug:
+                    self._log.write("Sent routing packet from {}".format(
+                        self._network_id))
 
     def update_route(self, packet):
         """Update routing table.
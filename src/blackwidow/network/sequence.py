@@ -0,0 +1,185 @@
+from bisect import bisect_right
+from collections import deque
+
+
+class PacketSet(object):
+    """Set of packet numbers that keeps the order they were added in.
+
+    Adding, removing and testing a packet number, and finding the packet
+    number added first, take constant time. Packet numbers are kept in a
+    dictionary and their order in a deque. Removed packet numbers are only
+    dropped from the deque once they reach its front, or when the deque
+    holds more removed than current packet numbers.
+
+    Parameters
+    ----------
+    numbers : iterable, optional
+        Packet numbers to add (the default is no packet numbers).
+
+    Methods
+    -------
+    add(number)
+        Adds a packet number after all others if it is not in the set.
+    discard(number)
+        Removes a packet number if it is in the set.
+    first()
+        Returns the packet number that was added first.
+    """
+
+    __slots__ = ['_serials', '_order', '_serial']
+
+    def __init__(self, numbers=()):
+        # Serial number of the add of each packet number in the set.
+        self._serials = {}
+        # (serial, packet number) of adds, oldest first. Adds whose serial
+        # is not the packet number's serial were removed.
+        self._order = deque()
+        self._serial = 0
+        for number in numbers:
+            self.add(number)
+
+    def __len__(self):
+        return len(self._serials)
+
+    def __contains__(self, number):
+        return number in self._serials
+
+    def __iter__(self):
+        serials = self._serials
+        for serial, number in list(self._order):
+            if serials.get(number) == serial:
+                yield number
+
+    def add(self, number):
+        """Adds a packet number after all others if it is not in the set.
+
+        Parameters
+        ----------
+        number : int
+            The packet number.
+        """
+        if number in self._serials:
+            return
+        self._serial += 1
+        self._serials[number] = self._serial
+        self._order.append((self._serial, number))
+
+    def discard(self, number):
+        """Removes a packet number if it is in the set.
+
+        Parameters
+        ----------
+        number : int
+            The packet number.
+        """
+        if self._serials.pop(number, None) is None:
+            return
+        if len(self._order) > 2 * len(self._serials) + 16:
+            serials = self._serials
+            self._order = deque(entry for entry in self._order
+                                if serials.get(entry[1]) == entry[0])
+
+    def first(self):
+        """Returns the packet number that was added first.
+
+        Returns
+        -------
+        int
+            The oldest packet number in the set.
+
+        Raises
+        ------
+        IndexError
+            If the set is empty.
+        """
+        serials = self._serials
+        order = self._order
+        while order:
+            serial, number = order[0]
+            if serials.get(number) == serial:
+                return number
+            order.popleft()
+        raise IndexError("first() of an empty PacketSet")
+
+
+class SequenceSet(object):
+    """Set of packet numbers stored as runs of consecutive numbers.
+
+    Packet numbers are usually added in nearly increasing order, e.g. the
+    packets acknowledged on a flow. The set keeps the smallest number that
+    is not in it, below which all numbers are in the set, and a sorted list
+    of the runs of numbers above it. Memory is proportional to the number
+    of gaps rather than to the number of packets, and testing a packet
+    number takes O(log gaps).
+
+    Attributes
+    ----------
+    next_missing : int
+        The smallest packet number that is not in the set.
+
+    Methods
+    -------
+    add(number)
+        Adds a packet number.
+    """
+
+    __slots__ = ['_next', '_starts', '_ends']
+
+    def __init__(self):
+        self._next = 0
+        # First and one past the last packet number of each run above
+        # next_missing. Runs are sorted, are not adjacent and start after
+        # next_missing.
+        self._starts = []
+        self._ends = []
+
+    @property
+    def next_missing(self):
+        return self._next
+
+    @next_missing.setter
+    def next_missing(self, value):
+        raise AttributeError("Cannot change next_missing")
+
+    def __contains__(self, number):
+        if number < self._next:
+            return True
+        i = bisect_right(self._starts, number)
+        return i > 0 and number < self._ends[i - 1]
+
+    def add(self, number):
+        """Adds a packet number.
+
+        Parameters
+        ----------
+        number : int
+            The packet number.
+        """
+        starts = self._starts
+        ends = self._ends
+        if number < self._next:
+            return
+        if number == self._next:
+            self._next += 1
+            if starts and starts[0] == self._next:
+                self._next = ends[0]
+                del starts[0]
+                del ends[0]
+            return
+        i = bisect_right(starts, number)
+        if i > 0 and ends[i - 1] >= number:
+            if ends[i - 1] > number:
+                return
+            # Extend the run before the number, joining it with the next
+            # run if the number fills the gap between them.
+            if i < len(starts) and starts[i] == number + 1:
+                ends[i - 1] = ends[i]
+                del starts[i]
+                del ends[i]
+            else:
+                ends[i - 1] = number + 1
+        elif i < len(starts) and starts[i] == number + 1:
+            starts[i] = number
+        else:
+            starts.insert(i, number)
+            ends.insert(i, number + 1)
@@ -58,12 +58,31 @@ class TahoeFlow(Flow):
         Variance of round trip times
     RTO : float
         Retransmission timeout in ms
-    packets_sent : list
-        List of packets that have been sent but haven't had their ack received
-    packets_time_out : list
-        List of packets that have exceeded timeout and need to be resent
-    acks_arrived : set
-        Set of ack packets that have been received
+    packets_sent : `PacketSet`
+        Packets that have been sent but haven't had their ack received, in
+        the order they were first sent
+    packets_time_out : `PacketSet`
+        Packets that have exceeded timeout and need to be resent, in the
+        order they are resent
+    acks_arrived : `SequenceSet`
+        Packets whose ack has been received
+    timed_packets : `PacketSet`
+        Packets that have been sent and whose timeout is pending, in the
+        order they were last sent
+    send_times : dict
+        Time each packet in timed_packets was last sent
+    timer : `EventHandle`
+        Pending retransmission timer event, or None if the timer is stopped.
+        A flow has a single timer, which expires RTO ms after the packet in
+        timed_packets that was sent first, as if each packet had its own
+        timer.
+    timer_expires : float
+        Time at which the retransmission timer expires.
+    send_slots : deque
+        Event slots reserved for sends after ack receivals, in the order they
+        are due.
+    send_event : `EventHandle`
+        Pending event for the earliest send slot, or None if the flow is idle.
     done : int
         0 if flow isn't finished; 1 if flow is finished
         Used to avoid decrementing flow more than once.
@@ -0,0 +1,267 @@
+from itertools import izip
+import mmap
+import os
+import numpy as np
+from metrics import (BLOCK, BLOCK_COUNT, COMPRESSIONS, COMPRESSORS, HEADER,
+                     MAGIC, NAME_SIZE, RESULT_EXTENSION, SECTIONS,
+                     VALUE_TYPES, Chunk, CsvWriter)
+
+
+class ResultFile(object):
+    """Reads a binary result file through a memory map.
+
+    Result files are written by `BinaryWriter` when a simulation is run with
+    the 'binary' data format. Only the index is read when the file is
+    opened. Queries for a time range find the blocks overlapping the range
+    by binary search on the first and last times of the blocks, and then
+    the points in the range by binary search on their times, so only those
+    blocks are read. Columns of uncompressed blocks are read straight from
+    the memory map.
+
+    Parameters
+    ----------
+    path : string
+        Path of the file, e.g. 'data/case0.bwr'.
+
+    Attributes
+    ----------
+    path : string
+        Path of the file.
+    names : list
+        Names of the channels in the file, in the order they were first
+        written.
+
+    Methods
+    -------
+    channels(entity=None, kind=None)
+        Returns the names of the channels of an entity or kind.
+    entities()
+        Returns the ids of the objects that recorded channels.
+    read(name, t_start=None, t_end=None)
+        Returns the points of a channel in a time range.
+    chunks(name)
+        Yields the blocks of a channel as chunks.
+    close()
+        Closes the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        header = self._file.read(HEADER.size)
+        if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+            self._file.close()
+            raise ValueError("{0} is not a result file.".format(path))
+        _, compression, index_offset, index_size = HEADER.unpack(header)
+        if index_offset == 0:
+            self._file.close()
+            raise ValueError("{0} was not closed by its writer.".format(path))
+        self._decompress = None
+        if COMPRESSIONS[compression] is not None:
+            self._decompress = COMPRESSORS[COMPRESSIONS[compression]][1]
+        self._map = mmap.mmap(self._file.fileno(), 0,
+                              access=mmap.ACCESS_READ)
+
+        index = self._map[index_offset:index_offset + index_size]
+        self.names = []
+        self._kinds = {}
+        self._entities = {}
+        self._blocks = {}
+        position = 0
+        while position < len(index):
+            texts = []
+            for _ in range(3):
+                size, = NAME_SIZE.unpack_from(index, position)
+                position += NAME_SIZE.size
+                texts.append(index[position:position + size])
+                position += size
+            name, kind, entity = texts
+            count, = BLOCK_COUNT.unpack_from(index, position)
+            position += BLOCK_COUNT.size
+            end = position + count * BLOCK.itemsize
+            self.names.append(name)
+            self._kinds[name] = kind or None
+            self._entities[name] = entity or None
+            self._blocks[name] = np.frombuffer(index[position:end], BLOCK)
+            position = end
+
+    def channels(self, entity=None, kind=None):
+        """Returns the names of the channels of an entity or kind.
+
+        Parameters
+        ----------
+        entity : string, optional
+            The id of a device or flow, e.g. 'L1' (the default is None,
+            which matches all entities).
+        kind : string, optional
+            The type of data, e.g. 'link.buffer' (the default is None, which
+            matches all kinds).
+
+        Returns
+        -------
+        list
+            Names of the matching channels in file order.
+        """
+        return [name for name in self.names
+                if (entity is None or self._entities[name] == entity) and
+                (kind is None or self._kinds[name] == kind)]
+
+    def entities(self):
+        """Returns the ids of the objects that recorded channels.
+
+        Returns
+        -------
+        list
+            Sorted ids of devices and flows, e.g. ['F1', 'L1'].
+        """
+        return sorted(set(entity for entity in self._entities.itervalues()
+                          if entity is not None))
+
+    def read(self, name, t_start=None, t_end=None):
+        """Returns the points of a channel in a time range.
+
+        Parameters
+        ----------
+        name : string
+            The name of the channel, e.g. 'link_L1.buffer'.
+        t_start : float, optional
+            The earliest time to return in ms (the default is None, which
+            starts at the first point).
+        t_end : float, optional
+            The latest time to return in ms (the default is None, which ends
+            at the last point).
+
+        Returns
+        -------
+        times : ndarray
+            The times of the points.
+        values : ndarray
+            The values of the points as floats, or None if the points of
+            the channel have no value.
+        """
+        blocks = self._channel_blocks(name)
+        first = 0
+        last = len(blocks)
+        if t_start is not None:
+            first = np.searchsorted(blocks['t_last'], t_start, 'left')
+        if t_end is not None:
+            last = np.searchsorted(blocks['t_first'], t_end, 'right')
+        chunks = [self._chunk(block) for block in blocks[first:last]]
+        has_values = len(blocks) > 0 and blocks[0]['value_type'] != 0
+        if not chunks:
+            return np.empty(0), np.empty(0) if has_values else None
+
+        times = np.concatenate([chunk.times for chunk in chunks])
+        start = 0
+        end = len(times)
+        if t_start is not None:
+            start = np.searchsorted(times, t_start, 'left')
+        if t_end is not None:
+            end = np.searchsorted(times, t_end, 'right')
+        if not has_values:
+            return times[start:end], None
+        # Concatenating copies the values out of the memory map, so that
+        # they stay valid after the file is closed.
+        values = np.concatenate([chunk.values for chunk in chunks])
+        return times[start:end], values[start:end]
+
+    def chunks(self, name):
+        """Yields the blocks of a channel as chunks.
+
+        Chunks may refer to the memory map, so they must be used before the
+        file is closed.
+
+        Parameters
+        ----------
+        name : string
+            The name of the channel.
+
+        Returns
+        -------
+        generator
+            A `Chunk` of numpy arrays per block, from which the points can
+            be restored exactly as they were recorded.
+        """
+        for block in self._channel_blocks(name):
+            yield self._chunk(block)
+
+    def _channel_blocks(self, name):
+        """Returns the index entries of the blocks of a channel."""
+        if name not in self._blocks:
+            raise KeyError("No channel {0} in {1}.".format(name, self.path))
+        return self._blocks[name]
+
+    def _chunk(self, block):
+        """Reads a block and returns it as a `Chunk`."""
+        offset = int(block['offset'])
+        columns = []
+        for size, (_, dtype) in izip(block['sizes'], SECTIONS):
+            size = int(size)
+            if self._decompress is not None:
+                data = self._decompress(self._map[offset:offset + size])
+                columns.append(np.frombuffer(data, dtype))
+            else:
+                columns.append(np.frombuffer(self._map, dtype,
+                                             size // np.dtype(dtype).itemsize,
+                                             offset))
+            offset += size
+        deltas, int_times, values, other_values = columns
+        times = np.cumsum(deltas).view('<f8')
+        return Chunk(times, int_times, values,
+                     VALUE_TYPES[block['value_type']], other_values)
+
+    def close(self):
+        """Closes the file."""
+        self._map.close()
+        self._file.close()
+
+
+def to_csv(path, prefix=None):
+    """Converts a binary result file to a CSV file per channel.
+
+    The CSV files are the same as those written when the simulation is run
+    with the 'csv' data format. Existing files are replaced.
+
+    Parameters
+    ----------
+    path : string
+        Path of the result file, e.g. 'data/case0.bwr'.
+    prefix : string, optional
+        Path prefix of the CSV files (the default is None, which uses the
+        path of the result file without its extension).
+
+    Returns
+    -------
+    list
+        Paths of the CSV files written.
+    """
+    if prefix is None:
+        prefix = os.path.splitext(path)[0]
+    results = ResultFile(path)
+    paths = []
+    try:
+        for name in results.names:
+            csv_path = '{}.{}.csv'.format(prefix, name)
+            if os.path.isfile(csv_path):
+                os.remove(csv_path)
+            writer = CsvWriter(prefix)
+            for chunk in results.chunks(name):
+                writer.write(name, chunk)
+            writer.close()
+            paths.append(csv_path)
+    finally:
+        results.close()
+    return paths
+
+
+def result_path(data_dir, log_file):
+    """Returns the path of the binary result file of a run.
+
+    Parameters
+    ----------
+    data_dir : string
+        Directory the data was written to.
+    log_file : string
+        Prefix of the data files of the run, e.g. 'case0'.
+    """
+    return '{}/{}.{}'.format(data_dir, log_file, RESULT_EXTENSION)
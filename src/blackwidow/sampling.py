@@ -0,0 +1,296 @@
+from abc import ABCMeta, abstractmethod
+
+
+class Sampler(object):
+    """Decides which points of a channel are stored.
+
+    A sampler receives every point recorded on its channel and passes the
+    ones to keep to the channel's store function, so that dropped points
+    are never stored. Samplers are created per channel by `parse_policy`.
+    Subclasses implement the abstract method `record`.
+
+    Parameters
+    ----------
+    store : function
+        Function storing a point, called as ``store(time, value)``.
+
+    Methods
+    -------
+    record(time, value)
+        Receives a recorded point.
+    finish()
+        Stores any points still held by the sampler.
+    """
+
+    __metaclass__ = ABCMeta
+
+    __slots__ = ['_store']
+
+    def __init__(self, store):
+        self._store = store
+
+    @abstractmethod
+    def record(self, time, value):
+        """Receives a recorded point.
+
+        Parameters
+        ----------
+        time : float
+            The time of the point in ms.
+        value : float
+            The value of the point, or None.
+        """
+
+    def finish(self):
+        """Stores any points still held by the sampler."""
+        pass
+
+
+class Discard(Sampler):
+    """Stores no points, e.g. when only summaries of a channel are kept.
+
+    Parameters
+    ----------
+    store : function
+        Function storing a point. Never called.
+    """
+
+    __slots__ = []
+
+    def record(self, time, value):
+        pass
+
+
+class EveryNth(Sampler):
+    """Stores every nth point, starting with the first.
+
+    Parameters
+    ----------
+    store : function
+        Function storing a point.
+    n : int
+        Number of recorded points per stored point.
+    """
+
+    __slots__ = ['_n', '_count']
+
+    def __init__(self, store, n):
+        super(EveryNth, self).__init__(store)
+        self._n = int(n)
+        if self._n < 1:
+            raise ValueError("Sampling every nth point needs n >= 1.")
+        self._count = 0
+
+    def record(self, time, value):
+        if self._count == 0:
+            self._store(time, value)
+        self._count += 1
+        if self._count == self._n:
+            self._count = 0
+
+
+class MinSpacing(Sampler):
+    """Stores a point only if it is at least a time spacing after the last
+    stored point.
+
+    Parameters
+    ----------
+    store : function
+        Function storing a point.
+    spacing : float
+        Minimum time between stored points in ms.
+    """
+
+    __slots__ = ['_spacing', '_last']
+
+    def __init__(self, store, spacing):
+        super(MinSpacing, self).__init__(store)
+        self._spacing = spacing
+        self._last = None
+
+    def record(self, time, value):
+        if self._last is None or time - self._last >= self._spacing:
+            self._last = time
+            self._store(time, value)
+
+
+class OnChange(Sampler):
+    """Stores a point only if its value differs from the last stored value
+    by more than epsilon. Only for channels whose points have values.
+
+    Parameters
+    ----------
+    store : function
+        Function storing a point.
+    epsilon : float
+        Largest change of value that is not stored.
+    """
+
+    __slots__ = ['_epsilon', '_last']
+
+    def __init__(self, store, epsilon):
+        super(OnChange, self).__init__(store)
+        self._epsilon = epsilon
+        self._last = None
+
+    def record(self, time, value):
+        if self._last is None or abs(value - self._last) > self._epsilon:
+            self._last = value
+            self._store(time, value)
+
+
+class Bucket(Sampler):
+    """Stores one point per time bucket with the minimum, maximum or mean of
+    the values recorded in the bucket. Only for channels whose points have
+    values.
+
+    The point is stored at the start time of the bucket once a point of a
+    later bucket is recorded, or when the sampler is finished. Buckets
+    without points are skipped.
+
+    Parameters
+    ----------
+    store : function
+        Function storing a point.
+    width : float
+        Width of the buckets in ms.
+    statistic : string
+        'min', 'max' or 'mean'.
+    """
+
+    __slots__ = ['_width', '_statistic', '_bucket', '_count', '_total']
+
+    def __init__(self, store, width, statistic):
+        super(Bucket, self).__init__(store)
+        if width <= 0:
+            raise ValueError("Bucket width must be positive.")
+        if statistic not in ['min', 'max', 'mean']:
+            raise ValueError("Unknown bucket statistic {0}.".format(statistic))
+        self._width = width
+        self._statistic = statistic
+        self._bucket = None
+        self._count = 0
+        self._total = None
+
+    def record(self, time, value):
+        bucket = int(time // self._width)
+        if bucket != self._bucket:
+            self.finish()
+            self._bucket = bucket
+            self._total = value
+            self._count = 1
+        elif self._statistic == 'min':
+            self._total = min(self._total, value)
+        elif self._statistic == 'max':
+            self._total = max(self._total, value)
+        else:
+            self._total += value
+            self._count += 1
+
+    def finish(self):
+        if self._count == 0:
+            return
+        value = self._total
+        if self._statistic == 'mean':
+            value = self._total / float(self._count)
+        self._store(self._bucket * self._width, value)
+        self._count = 0
+
+
+# Policies by name, with the type of their parameter.
+POLICIES = {
+    'every': (EveryNth, int),
+    'spacing': (MinSpacing, float),
+    'change': (OnChange, float),
+    'min': (lambda store, width: Bucket(store, width, 'min'), float),
+    'max': (lambda store, width: Bucket(store, width, 'max'), float),
+    'mean': (lambda store, width: Bucket(store, width, 'mean'), float),
+}
+
+# Policies that compare or average values, which channels recording times
+# only cannot use.
+VALUE_POLICIES = ['change', 'min', 'max', 'mean']
+
+
+def parse_policy(spec):
+    """Parses a sampling policy.
+
+    Parameters
+    ----------
+    spec : string
+        ``policy:parameter``, one of ``every:N`` to store every Nth point,
+        ``spacing:T`` to store points at least T ms apart, ``change:E`` to
+        store points whose value changed by more than E, and ``min:W``,
+        ``max:W`` or ``mean:W`` to store the minimum, maximum or mean value
+        of each W ms bucket. ``all`` stores every point and ``none`` stores
+        no points.
+
+    Returns
+    -------
+    function
+        Function creating a `Sampler` from a store function, or None for
+        ``all``.
+    """
+    spec = spec.strip()
+    if spec == 'all':
+        return None
+    if spec == 'none':
+        return Discard
+    name, sep, parameter = spec.partition(':')
+    if name not in POLICIES or not sep:
+        raise ValueError("Unknown sampling policy {0}.".format(spec))
+    policy, parameter_type = POLICIES[name]
+    try:
+        parameter = parameter_type(parameter)
+    except ValueError:
+        raise ValueError("Invalid parameter of sampling policy "
+                         "{0}.".format(spec))
+    # Check the parameter now rather than when a channel is created.
+    policy(None, parameter)
+    return lambda store: policy(store, parameter)
+
+
+def parse_policies(spec):
+    """Parses sampling policies of channels.
+
+    Parameters
+    ----------
+    spec : string
+        Comma separated list of ``key=policy`` items, where key is a channel
+        kind or name, or ``*`` for all other channels, e.g.
+        ``link.buffer=every:10,flow.window=mean:50``. See `parse_policy` for
+        the policies.
+
+    Returns
+    -------
+    dict
+        Policy specs by key.
+    """
+    policies = {}
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        key, sep, policy = item.partition('=')
+        if not sep:
+            raise ValueError("Sampling policy {0} has no "
+                             "channel.".format(item))
+        parse_policy(policy)
+        policies[key.strip()] = policy.strip()
+    return policies
+
+
+def needs_values(spec):
+    """Returns whether a sampling policy needs points with values.
+
+    Parameters
+    ----------
+    spec : string
+        The sampling policy, see `parse_policy`.
+
+    Returns
+    -------
+    bool
+        True for ``change``, ``min``, ``max`` and ``mean`` policies.
+    """
+    return spec.strip().partition(':')[0] in VALUE_POLICIES
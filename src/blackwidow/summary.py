@@ -0,0 +1,200 @@
+import json
+import math
+from sketch import QuantileSketch
+
+# Quantiles reported for channels with a sketch.
+QUANTILES = [0.5, 0.95, 0.99]
+
+
+class Summary(object):
+    """Streaming summary statistics of the points of a channel.
+
+    Statistics are updated as points are recorded, in constant memory, so
+    that a run can report them without storing its points. The mean and
+    variance are computed with Welford's method, which stays accurate over
+    millions of points. Values are also averaged over time, each value
+    being held until the next point, which is the average occupancy for
+    channels like link buffers. Quantiles of the values are estimated if
+    the summary has a `QuantileSketch`.
+
+    Parameters
+    ----------
+    sketch : `QuantileSketch`, optional
+        Sketch to add the values to (the default is None).
+
+    Attributes
+    ----------
+    count : int
+        Number of points.
+    first : float
+        Time of the first point, or None.
+    last : float
+        Time of the last point, or None.
+    minimum : float
+        Smallest value, or None.
+    maximum : float
+        Largest value, or None.
+    mean : float
+        Mean value, or None.
+    sketch : `QuantileSketch`
+        Sketch of the values, or None.
+
+    Methods
+    -------
+    add(time, value=None)
+        Adds a point.
+    variance()
+        Returns the variance of the values.
+    time_average()
+        Returns the time weighted average of the values.
+    report()
+        Returns the statistics as a dictionary.
+    """
+
+    __slots__ = ['count', 'first', 'last', 'minimum', 'maximum', 'mean',
+                 'sketch', '_squares', '_area', '_value']
+
+    def __init__(self, sketch=None):
+        self.count = 0
+        self.first = None
+        self.last = None
+        self.minimum = None
+        self.maximum = None
+        self.mean = None
+        self.sketch = sketch
+        # Sum of squared differences from the mean
+        self._squares = 0.0
+        # Integral of the values over time
+        self._area = 0.0
+        # Last value
+        self._value = None
+
+    def add(self, time, value=None):
+        """Adds a point.
+
+        Parameters
+        ----------
+        time : float
+            The time of the point in ms.
+        value : float, optional
+            The value of the point (the default is None, which only counts
+            the point).
+        """
+        self.count += 1
+        if self.first is None:
+            self.first = time
+        if value is not None:
+            if self._value is None:
+                self.minimum = value
+                self.maximum = value
+                self.mean = 0.0
+            else:
+                self._area += self._value * (time - self.last)
+                if value < self.minimum:
+                    self.minimum = value
+                elif value > self.maximum:
+                    self.maximum = value
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self._squares += delta * (value - self.mean)
+            self._value = value
+            if self.sketch is not None:
+                self.sketch.add(value)
+        self.last = time
+
+    def variance(self):
+        """Returns the variance of the values.
+
+        Returns
+        -------
+        float
+            The population variance, or None if there are no values.
+        """
+        if self.mean is None:
+            return None
+        return self._squares / self.count
+
+    def time_average(self):
+        """Returns the time weighted average of the values.
+
+        Each value is weighted by the time until the next point. The last
+        value has no weight.
+
+        Returns
+        -------
+        float
+            The average, or None if the values do not span any time.
+        """
+        if self.mean is None or self.last == self.first:
+            return None
+        return self._area / (self.last - self.first)
+
+    def report(self):
+        """Returns the statistics as a dictionary.
+
+        Returns
+        -------
+        dict
+            count, first and last for all channels, and min, max, mean, std
+            and time_average for channels whose points have values. With a
+            sketch, also the quantiles in `QUANTILES` as p50, p95 and p99
+            and the sketch itself.
+        """
+        report = {'count': self.count, 'first': self.first,
+                  'last': self.last}
+        if self.mean is not None:
+            report['min'] = self.minimum
+            report['max'] = self.maximum
+            report['mean'] = self.mean
+            report['std'] = math.sqrt(self.variance())
+            report['time_average'] = self.time_average()
+            if self.sketch is not None:
+                for q in QUANTILES:
+                    key = 'p{0:g}'.format(q * 100)
+                    report[key] = self.sketch.quantile(q)
+                report['sketch'] = self.sketch.to_dict()
+        return report
+
+
+def write_summary(path, channels):
+    """Writes the summaries of channels to a JSON file.
+
+    Parameters
+    ----------
+    path : string
+        Path of the file, e.g. 'data/case0.summary.json'.
+    channels : list
+        `Channel` objects. Channels without a summary are skipped.
+    """
+    summaries = {}
+    for channel in channels:
+        if channel.summary is not None:
+            report = channel.summary.report()
+            report['kind'] = channel.kind
+            report['entity'] = channel.entity
+            summaries[channel.name] = report
+    with open(path, 'w') as f:
+        json.dump(summaries, f, indent=1, sort_keys=True)
+
+
+def read_sketches(path):
+    """Reads the quantile sketches of a summary file.
+
+    Sketches of the same channel in replicated runs can be merged with
+    `QuantileSketch.merge`.
+
+    Parameters
+    ----------
+    path : string
+        Path of a file written by `write_summary`.
+
+    Returns
+    -------
+    dict
+        `QuantileSketch` objects by channel name.
+    """
+    with open(path) as f:
+        summaries = json.load(f)
+    return dict((name, QuantileSketch.from_dict(report['sketch']))
+                for name, report in summaries.iteritems()
+                if 'sketch' in report)
@@ -0,0 +1,32 @@
+"""Converts binary result files to CSV files.
+
+Writes a CSV file per data channel next to each result file, the same as
+the files written by a run with the 'csv' data format.
+
+Usage::
+
+    python convert_results.py data/case0.bwr
+"""
+import argparse
+from blackwidow.results import to_csv
+
+
+def main():
+    """Converts the result files given on the command line."""
+    parser = argparse.ArgumentParser(description='Convert binary result '
+                                                 'files to CSV files.')
+    parser.add_argument('files', metavar='result_file', type=str, nargs='+',
+                        help='Result files to convert.')
+    parser.add_argument('-p', '--prefix', type=str,
+                        help='Path prefix of the CSV files. Only valid with '
+                             'a single result file.')
+    args = parser.parse_args()
+    if args.prefix is not None and len(args.files) > 1:
+        parser.error('--prefix needs a single result file')
+
+    for f in args.files:
+        paths = to_csv(f, args.prefix)
+        print 'Wrote {0} CSV files from {1}'.format(len(paths), f)
+
+if __name__ == "__main__":
+    main()
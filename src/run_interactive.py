@@ -8,6 +8,7 @@ import matplotlib.image as mpimg
 from blackwidow import BlackWidow
 from blackwidow import parser
 from blackwidow.network import *
+from blackwidow.results import ResultFile, result_path
 
 import spider
 
@@ -743,6 +744,111 @@ class BlackWidowInteractive(cmd.Cmd):
         print "dump [filename]"
         print "Saves the network to a file"
 
+    def open_results(self):
+        """Opens the binary result file of the last run.
+
+        Returns
+        -------
+        `ResultFile`
+            The result file, or None if the run did not write one.
+        """
+        if self.bw.log_file is not None:
+            path = result_path(self.bw.data_dir, self.bw.log_file)
+            if os.path.isfile(path):
+                return ResultFile(path)
+        print "No result file. Run the network with the binary data format."
+        return None
+
+    def do_channels(self, line):
+        """Lists the recorded data channels.
+
+        Parameters
+        ----------
+        line : string
+            A string containing command line arguments.
+            See help_channels.
+        """
+
+        # Get the args
+        args = line.split()
+
+        # Make sure at most 1 argument is provided
+        if len(args) > 1:
+            print "*** invalid number of arguments"
+            return
+        try:
+            results = self.open_results()
+            if results is None:
+                return
+            if args:
+                names = results.channels(args[0])
+            else:
+                names = results.names
+            results.close()
+            for name in names:
+                print name
+        except Exception as e:
+            print e
+
+    def help_channels(self):
+        """Prints help message for channels command"""
+        print "channels [id]"
+        print ("List the data channels recorded by the device or flow id, or"
+               " all channels if no id is given")
+
+    def do_plot(self, line):
+        """Plots a data channel over a time range.
+
+        Parameters
+        ----------
+        line : string
+            A string containing command line arguments. See help_plot.
+        """
+
+        # Get the args. Channel names can contain spaces.
+        args = line.split()
+        t_start = None
+        t_end = None
+        if len(args) >= 3:
+            try:
+                t_start = float(args[-2])
+                t_end = float(args[-1])
+                args = args[:-2]
+            except ValueError:
+                t_start = None
+                t_end = None
+        if not args:
+            print "*** invalid number of arguments"
+            return
+        name = ' '.join(args)
+        try:
+            results = self.open_results()
+            if results is None:
+                return
+            try:
+                # Only the blocks of the file in the time range are read
+                times, values = results.read(name, t_start, t_end)
+            finally:
+                results.close()
+
+            plt.figure(1)
+            if values is None:
+                plt.plot(times, [0] * len(times), '|', label=name)
+            else:
+                plt.plot(times, values, label=name)
+            plt.legend()
+            plt.xlabel('time (ms)', fontsize=18)
+            plt.draw()
+            plt.show()
+        except Exception as e:
+            print e
+
+    def help_plot(self):
+        """Prints help message for plot command"""
+        print "plot [channel] [t_start t_end]"
+        print ("Plot a data channel of the last run, between t_start and"
+               " t_end in ms if given")
+
     def do_EOF(self, line):
         """Ends the program.
 
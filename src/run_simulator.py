@@ -21,6 +21,7 @@ def main():
                         help='name of file to process. e.g. case0.json')
     # Flag to show verbose output
     parser.add_argument('-v', '--verbose', action='store_true',
+                        dest='show_verbose',
                         help='whether to print verbose statements')
     # Flag to graph in real time
     parser.add_argument('-r', '--real-time', action='store_true',
@@ -34,6 +35,52 @@ def main():
     # Flag to set the TCP algorithm. Valid arguments are: Reno, Tahoe, Fast
     parser.add_argument('-t', '--tcp-alg', type=str,
                         help='Sets the TCP algorithm for the simulation.')
+    # Flag to set the event queue implementation.
+    parser.add_argument('-q', '--event-queue', type=str,
+                        choices=['heap', 'calendar'],
+                        help='Sets the event queue used to schedule events.')
+    # Flag to set log levels, e.g. "warning,F2=debug" to only log flow F2.
+    parser.add_argument('-l', '--log-levels', type=str,
+                        help='Sets log levels as a comma separated list of '
+                             'level or key=level items, where key is a '
+                             'component, an entity id or component:entity.')
+    # Flag to turn off recording of some data channels
+    parser.add_argument('-x', '--disabled-data', type=str,
+                        help='Comma separated kinds or names of data channels '
+                             'not to record, e.g. link.buffer,flow_F1.window')
+    # Flag to set sampling policies of data channels
+    parser.add_argument('-p', '--sampling', type=str,
+                        help='Comma separated key=policy items setting which '
+                             'points of data channels are stored, where key '
+                             'is a channel kind or name and policy is '
+                             'every:N, spacing:MS, change:EPSILON, min:MS, '
+                             'max:MS, mean:MS, all or none, e.g. '
+                             'link.buffer=mean:10,flow.window=change:1')
+    # Flags to keep summary statistics instead of all points
+    parser.add_argument('-m', '--summary', action='store_true',
+                        help='Writes summary statistics of each data channel '
+                             'to [log_file].summary.json')
+    parser.add_argument('-k', '--quantiles', type=str,
+                        help='Comma separated kinds or names of data channels '
+                             'to estimate p50, p95 and p99 of, e.g. '
+                             'flow.packet_delay,link.buffer')
+    parser.add_argument('--no-raw-data', dest='raw_data',
+                        action='store_false',
+                        help='Stores no points of data channels without '
+                             'their own sampling policy')
+    # Flag to write data files from a separate process
+    parser.add_argument('-w', '--data-writer', type=str,
+                        choices=['file', 'process'],
+                        help='Sets how data files are written. "process" '
+                             'writes them from a separate process.')
+    # Flags to write data to a single binary result file
+    parser.add_argument('-f', '--data-format', type=str,
+                        choices=['csv', 'binary'],
+                        help='Sets the format of data files. "binary" '
+                             'writes a single result file per run.')
+    parser.add_argument('-z', '--data-compression', type=str,
+                        choices=['zlib', 'bz2'],
+                        help='Compresses binary result files.')
     # Flag to use non-interactive mode
     parser.add_argument('-n', '--no-interactive', action='store_true',
                         help='Sets interactive mode off')
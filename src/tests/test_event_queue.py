@@ -0,0 +1,136 @@
+import pickle
+import random
+
+from blackwidow.network.event import Event, SEND, TIMEOUT
+from blackwidow.network.event_queue import (CalendarEventQueue,
+                                            HeapEventQueue, make_event_queue)
+
+
+def test_order():
+    for q in [HeapEventQueue(), CalendarEventQueue()]:
+        q.put(5, 'c')
+        q.put(1, 'a')
+        q.put(3, 'b')
+        assert [q.get() for i in range(3)] == [(1, 'a'), (3, 'b'), (5, 'c')]
+        assert q.empty()
+
+
+def test_ties_in_insertion_order():
+    for q in [HeapEventQueue(), CalendarEventQueue()]:
+        for name in ['first', 'second', 'third']:
+            q.put(2, name)
+        assert [q.get()[1] for i in range(3)] == ['first', 'second', 'third']
+
+
+def test_reserve():
+    for q in [HeapEventQueue(), CalendarEventQueue()]:
+        seq = q.reserve()
+        q.put(1, 'b')
+        q.put(1, 'a', seq)
+        assert [q.get() for i in range(2)] == [(1, 'a'), (1, 'b')]
+        assert q.seq == 1
+
+
+def test_zero_delay_lane():
+    for q in [HeapEventQueue(), CalendarEventQueue()]:
+        seq = q.reserve()
+        q.put(2, 'later')
+        q.put(1, 'first')
+        assert q.get() == (1, 'first')
+        # Events for the current time go to the lane, but still run after
+        # events already scheduled for that time with a smaller seq.
+        q.put(1, 'lane a')
+        q.put(1, 'main', seq)
+        q.put(1, 'lane b')
+        assert [q.get()[1] for i in range(4)] == ['main', 'lane a', 'lane b',
+                                                  'later']
+        assert q.empty()
+
+
+def test_clear():
+    for q in [HeapEventQueue(), CalendarEventQueue()]:
+        q.put(1, 'a')
+        q.clear()
+        assert q.empty()
+        assert len(q) == 0
+
+
+def test_same_order_as_heap():
+    """Interleave puts and gets like a simulation and check that the
+    calendar queue runs events in the same order as the heap."""
+    rng = random.Random(0)
+    delays = [0, 0, 0.8192, 10, 20, 100, 1000, 3000, 5000, -1]
+    heap = HeapEventQueue()
+    calendar = CalendarEventQueue()
+    handles = []
+    now = 0
+    for i in range(200):
+        heap.put(now, i)
+        calendar.put(now, i)
+    for i in range(200, 20000):
+        r = rng.random()
+        if r < 0.5 and not heap.empty():
+            now, event = heap.get()
+            assert calendar.get() == (now, event)
+        elif r < 0.6 and handles:
+            handle_a, handle_b = handles.pop(rng.randrange(len(handles)))
+            handle_a.cancel()
+            handle_b.cancel()
+        else:
+            time = now + rng.choice(delays)
+            handles.append((heap.put(time, i), calendar.put(time, i)))
+        assert len(heap) == len(calendar)
+    while not heap.empty():
+        assert calendar.get() == heap.get()
+    assert calendar.empty()
+
+
+def test_cancel():
+    for q in [HeapEventQueue(), CalendarEventQueue()]:
+        q.put(1, 'a')
+        handle = q.put(2, 'b')
+        q.put(3, 'c')
+        handle.cancel()
+        handle.cancel()
+        assert not handle.pending
+        assert (q.live, q.dead) == (2, 1)
+        assert [q.get() for i in range(2)] == [(1, 'a'), (3, 'c')]
+        assert q.empty()
+        assert (q.live, q.dead) == (0, 0)
+
+
+def test_cancel_after_run():
+    for q in [HeapEventQueue(), CalendarEventQueue()]:
+        handle = q.put(1, 'a')
+        q.put(2, 'b')
+        assert q.get() == (1, 'a')
+        handle.cancel()
+        assert (q.live, q.dead) == (1, 0)
+
+
+def test_compaction():
+    for q in [HeapEventQueue(), CalendarEventQueue()]:
+        handles = [q.put(i, i) for i in range(1000)]
+        for handle in handles[:900]:
+            handle.cancel()
+            assert q.dead <= q.live + 64
+        assert len(q) == 100
+        assert [q.get()[1] for i in range(100)] == range(900, 1000)
+
+
+def test_unknown_queue():
+    try:
+        make_event_queue('splay')
+    except ValueError:
+        pass
+    else:
+        assert False
+
+
+def test_pickle():
+    for q in [HeapEventQueue(), CalendarEventQueue()]:
+        q.put(2, Event(TIMEOUT, 0))
+        q.put(1, Event(SEND, 1))
+        q = pickle.loads(pickle.dumps(q, pickle.HIGHEST_PROTOCOL))
+        assert q.get() == (1, Event(SEND, 1))
+        assert q.get() == (2, Event(TIMEOUT, 0))
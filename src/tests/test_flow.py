@@ -0,0 +1,44 @@
+from blackwidow import BlackWidow
+from blackwidow.parser import config_network
+
+
+def tahoe_flow():
+    bw = BlackWidow({'tcp_alg': 'Tahoe'})
+    network = config_network('cases/case0.json', bw)
+    return network.flows['F1']
+
+
+def test_timeout_marks_oldest_packet():
+    flow = tahoe_flow()
+    # All data was sent once and 8 packets are waiting for their ack.
+    flow._amount = 0
+    for n in range(8):
+        flow._packets_sent.add(n)
+        flow._start_timer(n)
+    flow._timeout()
+    assert flow._cwnd == 1.0
+    assert list(flow._packets_time_out) == [0]
+    # The other packets time out RTO ms after they were sent.
+    assert list(flow._timed_packets) == range(1, 8)
+    assert flow._timer.pending and flow._timer.time == flow._RTO
+    flow.send_packet()
+    assert len(flow._packets_time_out) == 0
+    assert list(flow._timed_packets) == range(1, 8) + [0]
+    assert [point[1] for point in flow._send_rate.window] == [8192]
+
+
+def test_timer_moves_earlier_when_rto_shrinks():
+    flow = tahoe_flow()
+    flow._packets_sent.add(0)
+    flow._start_timer(0)
+    timer = flow._timer
+    assert timer.time == 3000
+    flow._RTO = 1000
+    flow._restart_timer()
+    assert not timer.pending
+    assert flow._timer.pending and flow._timer.time == 1000
+    # A longer RTO leaves the event in place until it runs.
+    timer = flow._timer
+    flow._RTO = 2000
+    flow._restart_timer()
+    assert flow._timer is timer and flow._timer_expires == 2000
@@ -0,0 +1,34 @@
+from cStringIO import StringIO
+
+from blackwidow.log import DEBUG, INFO, WARNING, Log
+
+
+def test_levels():
+    log = Log()
+    log.configure('info,flow=warning,flow:F2=debug,L1=debug')
+    assert log.level == INFO
+    assert log.level_of('flow', 'F1') == WARNING
+    assert log.level_of('flow', 'F2') == DEBUG
+    assert log.level_of('link', 'L1') == DEBUG
+    assert log.level_of('link', 'L2') == INFO
+
+
+def test_loggers_follow_levels():
+    log = Log()
+    logger = log.get_logger('flow', 'F1')
+    assert not logger.info
+    log.set_level(DEBUG, entity='F1')
+    assert logger.debug
+    assert log.get_logger('flow', 'F1') is logger
+
+
+def test_buffered_write():
+    stream = StringIO()
+    log = Log(stream=stream, buffer_size=2)
+    log.write('a')
+    assert stream.getvalue() == ''
+    log.write('b')
+    log.write('c')
+    assert stream.getvalue() == 'a\nb\n'
+    log.flush()
+    assert stream.getvalue() == 'a\nb\nc\n'
@@ -0,0 +1,76 @@
+from blackwidow.log import Log
+from blackwidow.metrics import CHUNK_SIZE, Metrics
+
+
+def test_channel_rows():
+    metrics = Metrics(Log())
+    channel = metrics.channel('link.buffer', 'link_L1.buffer')
+    channel.record(1.5, 1024)
+    drops = metrics.channel('link.drop', 'link_L1.drop')
+    drops.record(2.5)
+    assert list(channel.rows()) == ['1.5, 1024']
+    assert list(drops.rows()) == ['2.5']
+    assert metrics.channel('link.buffer', 'link_L1.buffer') is channel
+    assert metrics.channels == [channel, drops]
+
+
+def test_disabled_channels():
+    metrics = Metrics(Log(), ['link.buffer', 'flow_F1.window'])
+    assert not metrics.channel('link.buffer', 'link_L1.buffer').enabled
+    assert not metrics.channel('flow.window', 'flow_F1.window').enabled
+    window = metrics.channel('flow.window', 'flow_F2.window')
+    assert window.enabled
+    metrics.set_enabled('flow.window', False)
+    assert not window.enabled
+
+
+def test_channel_keeps_number_types():
+    channel = Metrics(Log()).channel('flow.window', 'flow_F1.window')
+    channel.record(0, 1.0)
+    channel.record(10, 2)
+    channel.record(10.5, 0.1 + 0.2)
+    assert list(channel.rows()) == ['0, 1.0', '10, 2', '10.5, 0.3']
+
+
+def test_streaming(tmpdir):
+    metrics = Metrics(Log())
+    early = metrics.channel('link.drop', 'link_L1.drop')
+    early.record(0)
+    prefix = str(tmpdir.join('case'))
+    metrics.open(prefix)
+    window = metrics.channel('flow.window', 'flow_F1.window')
+    for i in range(CHUNK_SIZE + 1):
+        window.record(float(i), 1.0)
+    # A full chunk has been written out while the run goes on.
+    assert len(window) == 1
+    metrics.close()
+    rows = ['{0}, 1.0\n'.format(float(i)) for i in range(CHUNK_SIZE + 1)]
+    assert tmpdir.join('case.flow_F1.window.csv').readlines() == rows
+    assert tmpdir.join('case.link_L1.drop.csv').read() == '0\n'
+
+
+def test_process_writer(tmpdir):
+    metrics = Metrics(Log())
+    metrics.open(str(tmpdir.join('case')), 'process')
+    channel = metrics.channel('link.buffer', 'link_L1.buffer')
+    for i in range(CHUNK_SIZE + 1):
+        channel.record(i + 0.5, i)
+    channel.record(10, 0.5)
+    metrics.close()
+    rows = ['{0}, {1}\n'.format(i + 0.5, i) for i in range(CHUNK_SIZE + 1)]
+    assert tmpdir.join('case.link_L1.buffer.csv').readlines() == rows + [
+        '10, 0.5\n']
+
+
+def test_process_writer_flush(tmpdir):
+    metrics = Metrics(Log())
+    metrics.open(str(tmpdir.join('case')), 'process')
+    channel = metrics.channel('link.buffer', 'link_L1.buffer')
+    channel.record(1.5, 1024)
+    # Flushed points are in the file before the writer is closed.
+    metrics.flush()
+    assert tmpdir.join('case.link_L1.buffer.csv').read() == '1.5, 1024\n'
+    channel.record(2.5, 0)
+    metrics.close()
+    assert tmpdir.join('case.link_L1.buffer.csv').readlines() == [
+        '1.5, 1024\n', '2.5, 0\n']
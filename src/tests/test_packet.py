@@ -0,0 +1,29 @@
+import pickle
+from blackwidow.network.packet import AckPacket, DataPacket, RoutingPacket
+
+
+def test_packets_are_immutable():
+    packets = [DataPacket(1, 'H1', 'H2', 'F1', timestamp=2.0),
+               AckPacket(1, 'H2', 'H1', 'F1', 2, timestamp=2.0),
+               RoutingPacket('Routing Packet', 'R1', 'R2', None, {}, 512)]
+    for packet in packets:
+        for name in ['pack_id', 'size', 'is_ack', 'timestamp', 'extra']:
+            try:
+                setattr(packet, name, 0)
+            except AttributeError:
+                pass
+            else:
+                assert False
+    assert packets[0].size == 8192 and not packets[0].is_ack
+    assert packets[1].is_ack and packets[1].next_expected == 2
+    assert packets[2].is_routing and packets[2].size == 512
+
+
+def test_pickle_packets():
+    for protocol in [0, pickle.HIGHEST_PROTOCOL]:
+        ack = pickle.loads(pickle.dumps(
+            AckPacket(3, 'H2', 'H1', 'F1', 4, timestamp=1.5), protocol))
+        assert type(ack) is AckPacket
+        assert (ack.pack_id, ack.src, ack.dest, ack.flow_id,
+                ack.next_expected, ack.timestamp) == (3, 'H2', 'H1', 'F1',
+                                                      4, 1.5)
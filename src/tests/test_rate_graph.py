@@ -0,0 +1,43 @@
+from blackwidow import BlackWidow
+from blackwidow.network.packet import DataPacket
+from blackwidow.parser import config_network
+
+
+def test_idle_rate_graphs():
+    bw = BlackWidow({'tcp_alg': 'Tahoe'})
+    network = config_network('cases/case0.json', bw)
+    network.run()
+    sampler = network.rate_sampler
+    channel = bw.metrics.channel(None, 'flow F1 receive rate')
+    times = list(channel._times)
+    values = list(channel._values)
+    # The flow is idle during timeouts, so some samples are skipped.
+    assert len(times) < (times[-1] - times[0]) / sampler.interval
+    gaps = 0
+    for i in range(1, len(times)):
+        assert times[i] - times[i - 1] >= sampler.interval
+        if times[i] - times[i - 1] > sampler.interval:
+            # A gap starts with the rate dropping to 0 and ends with one
+            # catch-up sample of 0.
+            assert values[i - 1] == 0 and values[i] == 0
+            gaps += 1
+    assert gaps > 0
+
+
+def test_deleted_rate_graphs():
+    bw = BlackWidow({'tcp_alg': 'Tahoe'})
+    network = config_network('cases/case0.json', bw)
+    sampler = network.rate_sampler
+    graph = network.flows['F1']._send_rate
+    graph.add_point(DataPacket(0, 'H1', 'H2', 'F1'), 0)
+    network.delete_flow('F1')
+    sampler.graph()
+    assert graph not in sampler.graphs
+    assert graph._sampler_slot is None and graph._window is None
+    for slot, other in enumerate(sampler.graphs):
+        assert other._sampler_slot == slot
+        assert other.window is sampler.windows[slot]
+    # A rate graph added again starts with an empty window.
+    sampler.add(graph)
+    assert sampler.graphs[graph._sampler_slot] is graph
+    assert len(graph.window) == 0 and graph.bits_in_window == 0
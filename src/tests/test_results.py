@@ -0,0 +1,70 @@
+from blackwidow.log import Log
+from blackwidow.metrics import CHUNK_SIZE, Metrics
+from blackwidow.results import ResultFile, to_csv
+
+
+def record(metrics):
+    buffer = metrics.channel('link.buffer', 'link_L1.buffer', 'L1')
+    drops = metrics.channel('link.drop', 'link_L1.drop', 'L1')
+    metrics.channel('flow.window', 'flow_F1.window', 'F1').record(0, 1)
+    for i in range(CHUNK_SIZE + 10):
+        buffer.record(i * 0.1, i)
+        if i % 100 == 0:
+            drops.record(i)
+    buffer.record(CHUNK_SIZE, 0.5)
+
+
+def test_binary_matches_csv(tmpdir):
+    metrics = Metrics(Log())
+    metrics.open(str(tmpdir.join('csv')))
+    record(metrics)
+    metrics.close()
+    for compression in [None, 'zlib', 'bz2']:
+        metrics = Metrics(Log())
+        metrics.open(str(tmpdir.join('binary')), data_format='binary',
+                     compression=compression)
+        record(metrics)
+        metrics.close()
+        to_csv(str(tmpdir.join('binary.bwr')))
+        for name in ['link_L1.buffer', 'link_L1.drop', 'flow_F1.window']:
+            csv = tmpdir.join('csv.{0}.csv'.format(name)).read()
+            assert tmpdir.join('binary.{0}.csv'.format(name)).read() == csv
+
+
+def test_read(tmpdir):
+    metrics = Metrics(Log())
+    metrics.open(str(tmpdir.join('case')), data_format='binary')
+    record(metrics)
+    metrics.close()
+    results = ResultFile(str(tmpdir.join('case.bwr')))
+    assert results.names == ['link_L1.buffer', 'link_L1.drop',
+                             'flow_F1.window']
+    assert results.entities() == ['F1', 'L1']
+    assert results.channels('L1') == ['link_L1.buffer', 'link_L1.drop']
+    assert results.channels(kind='flow.window') == ['flow_F1.window']
+    times, values = results.read('link_L1.buffer')
+    assert len(times) == CHUNK_SIZE + 11
+    assert times[3] == 3 * 0.1 and values[3] == 3
+    times, values = results.read('link_L1.drop')
+    assert list(times[:2]) == [0, 100] and values is None
+    results.close()
+
+
+def test_read_range(tmpdir):
+    metrics = Metrics(Log())
+    metrics.open(str(tmpdir.join('case')), data_format='binary',
+                 compression='zlib')
+    record(metrics)
+    metrics.close()
+    results = ResultFile(str(tmpdir.join('case.bwr')))
+    all_times, all_values = results.read('link_L1.buffer')
+    for t_start, t_end in [(0, 1), (409.45, 409.7), (500, None),
+                           (None, -1), (3, 2)]:
+        times, values = results.read('link_L1.buffer', t_start, t_end)
+        in_range = ((t_start is None or all_times >= t_start) &
+                    (t_end is None or all_times <= t_end))
+        assert list(times) == list(all_times[in_range])
+        assert list(values) == list(all_values[in_range])
+    times, values = results.read('link_L1.drop', 150, 350)
+    assert list(times) == [200, 300] and values is None
+    results.close()
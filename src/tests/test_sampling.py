@@ -0,0 +1,64 @@
+from blackwidow.log import Log
+from blackwidow.metrics import Metrics
+from blackwidow.sampling import parse_policies
+
+
+def sample(policy, points):
+    metrics = Metrics(Log(), sampling={'link.buffer': policy})
+    channel = metrics.channel('link.buffer', 'link_L1.buffer')
+    for time, value in points:
+        channel.record(time, value)
+    metrics.close()
+    return list(channel.rows())
+
+
+def test_policies():
+    points = [(0, 1), (1, 1), (2, 4), (3.5, 4.2), (10, 2), (12, 6)]
+    assert sample('every:2', points) == ['0, 1', '2, 4', '10, 2']
+    assert sample('spacing:2', points) == ['0, 1', '2, 4', '10, 2', '12, 6']
+    assert sample('change:0.5', points) == ['0, 1', '2, 4', '10, 2',
+                                            '12, 6']
+    assert sample('max:5', points) == ['0.0, 4.2', '10.0, 6']
+    assert sample('mean:5', points) == ['0.0, 2.55', '10.0, 4.0']
+    assert sample('all', points) == ['0, 1', '1, 1', '2, 4', '3.5, 4.2',
+                                     '10, 2', '12, 6']
+
+
+def test_name_overrides_kind():
+    metrics = Metrics(Log(), sampling=parse_policies(
+        'link.buffer=every:100, link_L2.buffer=all'))
+    first = metrics.channel('link.buffer', 'link_L1.buffer')
+    second = metrics.channel('link.buffer', 'link_L2.buffer')
+    for i in range(10):
+        first.record(i, i)
+        second.record(i, i)
+    assert len(first) == 1 and len(second) == 10
+    for spec in ['link.buffer=every:0', 'link.buffer=median:10']:
+        try:
+            parse_policies(spec)
+        except ValueError:
+            pass
+        else:
+            assert False
+
+
+def test_value_policies_need_values():
+    metrics = Metrics(Log(), sampling={'link.drop': 'mean:10'})
+    try:
+        metrics.channel('link.drop', 'link_L1.drop', values=False)
+    except ValueError:
+        pass
+    else:
+        assert False
+    metrics = Metrics(Log(), sampling={'link.drop': 'every:2'})
+    drops = metrics.channel('link.drop', 'link_L1.drop', values=False)
+    try:
+        metrics.set_sampling('link_L1.drop', 'change:0')
+    except ValueError:
+        pass
+    else:
+        assert False
+    # The previous policy is kept.
+    for time in range(5):
+        drops.record(time)
+    assert list(drops.rows()) == ['0', '2', '4']
@@ -0,0 +1,54 @@
+import random
+from blackwidow.network.sequence import PacketSet, SequenceSet
+
+
+def test_packet_set_order():
+    packets = PacketSet([3, 1, 2])
+    packets.add(1)
+    assert len(packets) == 3
+    assert list(packets) == [3, 1, 2]
+    assert packets.first() == 3
+    packets.discard(3)
+    packets.discard(5)
+    assert 3 not in packets and 1 in packets
+    assert packets.first() == 1
+    # A packet added again goes after all others.
+    packets.discard(1)
+    packets.add(1)
+    assert list(packets) == [2, 1]
+    assert packets.first() == 2
+
+
+def test_packet_set_compacts():
+    packets = PacketSet(range(1000))
+    for n in range(1, 999):
+        packets.discard(n)
+    assert list(packets) == [0, 999]
+    assert len(packets._order) < 100
+    packets.discard(0)
+    packets.discard(999)
+    try:
+        packets.first()
+    except IndexError:
+        pass
+    else:
+        assert False
+
+
+def test_sequence_set():
+    random.seed(1)
+    numbers = SequenceSet()
+    added = set()
+    missing = 0
+    for i in range(5000):
+        n = int(random.expovariate(1.0 / 50)) + i // 2
+        numbers.add(n)
+        added.add(n)
+        while missing in added:
+            missing += 1
+        assert numbers.next_missing == missing
+    for n in range(max(added) + 10):
+        assert (n in numbers) == (n in added)
+    # Only the runs after the first missing number are stored.
+    runs = [n for n in added if n > missing and n - 1 not in added]
+    assert numbers._starts == sorted(runs)
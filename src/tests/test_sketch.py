@@ -0,0 +1,50 @@
+import random
+from blackwidow import BlackWidow
+from blackwidow.parser import config_network
+from blackwidow.sketch import QuantileSketch
+
+
+def exact(values, q):
+    return sorted(values)[int(q * (len(values) - 1))]
+
+
+def check(sketch, values):
+    for q in [0, 0.01, 0.25, 0.5, 0.9, 0.95, 0.99, 0.999, 1]:
+        estimate = sketch.quantile(q)
+        value = exact(values, q)
+        assert abs(estimate - value) <= sketch.alpha * abs(value)
+
+
+def test_case_accuracy():
+    # Keep all points in memory to compare with the exact quantiles.
+    bw = BlackWidow({'quantiles': 'flow.packet_delay,link.buffer'})
+    network = config_network('cases/case0.json', bw)
+    network.run()
+    for name in ['flow_F1.packet_delay', 'link_L1.buffer']:
+        channel = bw.metrics.channel(None, name)
+        values = list(channel._values)
+        assert channel.summary.sketch.count == len(values) > 1000
+        check(channel.summary.sketch, values)
+
+
+def test_merge():
+    values = [random.lognormvariate(0, 2) for i in range(20000)]
+    values += [0] * 100 + [-value for value in values[:500]]
+    sketches = [QuantileSketch(), QuantileSketch()]
+    for i, value in enumerate(values):
+        sketches[i % 2].add(value)
+    sketches[0].merge(QuantileSketch.from_dict(sketches[1].to_dict()))
+    assert sketches[0].count == len(values)
+    check(sketches[0], values)
+
+
+def test_bounded_buckets():
+    sketch = QuantileSketch(max_buckets=100)
+    values = [1.01 ** i for i in range(10000)]
+    for value in values:
+        sketch.add(value)
+    assert len(sketch.to_dict()['positive']) == 100
+    # Only the lowest quantiles lose accuracy.
+    for q in [0.99, 0.999, 1]:
+        value = exact(values, q)
+        assert abs(sketch.quantile(q) - value) <= sketch.alpha * value
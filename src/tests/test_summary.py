@@ -0,0 +1,63 @@
+import json
+import random
+import numpy as np
+from blackwidow import BlackWidow
+from blackwidow.log import Log
+from blackwidow.metrics import Metrics
+from blackwidow.parser import config_network
+from blackwidow.summary import Summary
+
+
+def test_statistics():
+    values = [random.gauss(1e6, 1.0) for i in range(10000)]
+    summary = Summary()
+    for i, value in enumerate(values):
+        summary.add(i, value)
+    assert summary.count == 10000
+    assert abs(summary.mean - np.mean(values)) < 1e-6
+    assert abs(summary.variance() - np.var(values)) < 1e-6
+    assert summary.minimum == min(values)
+    assert summary.maximum == max(values)
+
+
+def test_time_average():
+    summary = Summary()
+    # 10 for 1 ms, then 0 for 3 ms
+    for time, value in [(0, 10), (1, 0), (4, 5)]:
+        summary.add(time, value)
+    assert summary.time_average() == 2.5
+    assert summary.mean == 5
+
+
+def test_summary_only(tmpdir):
+    metrics = Metrics(Log(), sampling={'*': 'none'}, summary=True)
+    metrics.open(str(tmpdir.join('case')))
+    buffer = metrics.channel('link.buffer', 'link_L1.buffer', 'L1')
+    drops = metrics.channel('link.drop', 'link_L1.drop', 'L1')
+    for i in range(100):
+        buffer.record(i, i % 10)
+    drops.record(5)
+    metrics.close()
+    assert [f.basename for f in tmpdir.listdir()] == ['case.summary.json']
+    summaries = json.load(tmpdir.join('case.summary.json').open())
+    assert summaries['link_L1.buffer']['max'] == 9
+    assert summaries['link_L1.buffer']['entity'] == 'L1'
+    assert summaries['link_L1.drop'] == {'count': 1, 'first': 5, 'last': 5,
+                                         'kind': 'link.drop', 'entity': 'L1'}
+
+
+def test_summary_of_run(tmpdir):
+    # Value policies for '*' skip channels recording times only.
+    bw = BlackWidow({'log_file': 'case0', 'data_dir': str(tmpdir),
+                     'sampling': '*=mean:100', 'raw_data': False,
+                     'summary': True})
+    network = config_network('cases/case0.json', bw)
+    bw.metrics.set_sampling('*', 'mean:100')
+    network.run()
+    bw.metrics.close()
+    summaries = json.load(tmpdir.join('case0.summary.json').open())
+    assert 'mean' not in summaries['link_L1.drop']
+    completion = summaries['flow_F1.completion_time']
+    start = network.flows['F1'].flow_start
+    assert completion['count'] == 1
+    assert completion['mean'] == completion['last'] - start